@@ -0,0 +1,72 @@
+"""Paste.compare_to's diff engine, difflib against pastie.lib.diff
+
+Times the unified diff of a few pairs of big pastes: with a few edits, the
+usual case for a reply, with a few edits but made of a couple hundred
+repeated lines, where difflib goes quadratic, and dissimilar ones.
+
+Usage: python benchmarks/bench_diff.py [lines]
+"""
+import os
+import sys
+import time
+import random
+import difflib
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pastie.lib.diff import DiffTooLarge, unified_diff
+
+WORK_BUDGET = 1000000
+
+def edited(lines):
+    source = ['    value_%d = compute(%d)' % (i, i) for i in xrange(lines)]
+    target = list(source)
+    for i in xrange(0, lines, lines // 20):
+        target[i] = target[i] + '  # changed'
+    return source, target
+
+def repeated(lines):
+    alphabet = ['    line(%d);' % i for i in xrange(200)]
+    return [random.choice(alphabet) for i in xrange(lines)]
+
+def edited_repeated(lines):
+    source = repeated(lines)
+    target = list(source)
+    for i in xrange(0, lines, lines // 50):
+        target[i] = 'changed'
+    return source, target
+
+def dissimilar_repeated(lines):
+    return repeated(lines), repeated(lines)
+
+def dissimilar(lines):
+    return (['a line %d' % i for i in xrange(lines)],
+            ['another line %d' % i for i in xrange(lines)])
+
+def run_difflib(a, b):
+    return list(difflib.unified_diff(a, b, lineterm='', n=4))
+
+def run_pastie(a, b):
+    try:
+        return unified_diff(a, b, n=4, max_work=WORK_BUDGET)
+    except DiffTooLarge:
+        return None
+
+def timed(func, a, b):
+    start = time.time()
+    result = func(a, b)
+    return time.time() - start, result
+
+def main(lines=20000):
+    random.seed(0)
+    print '%-20s %12s %12s  %s' % ('inputs', 'difflib', 'pastie', 'result')
+    for case in (edited, edited_repeated, dissimilar_repeated, dissimilar):
+        a, b = case(lines)
+        before, _ = timed(run_difflib, a, b)
+        after, result = timed(run_pastie, a, b)
+        print '%-20s %10.3f s %10.3f s  %s' % (
+            case.__name__, before, after,
+            result is None and 'differ too much' or '%d lines' % len(result))
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:2]])
@@ -0,0 +1,53 @@
+"""Per render setup cost of pastie.lib.highlight
+
+Compares what every render used to pay before any lexing happens, building
+a new lexer and reconfiguring the shared formatter, against the shared
+lexer cache, and times a full render of a small paste both ways.
+
+Usage: python benchmarks/bench_highlight.py [iterations]
+"""
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pygments import highlight
+from pygments.lexers import get_lexer_by_name
+
+from pastie.lib import highlight as hl
+
+SOURCE = u'''def greet(name):
+    """Say hello"""
+    print "Hello, %s!" % name
+
+for name in ("world", "pastie"):
+    greet(name)
+'''
+
+def setup_before():
+    lexer = get_lexer_by_name('python', stripall=True)
+    hl.formatter.lineanchors = hl.ANCHORS_PLACEHOLDER
+    return lexer
+
+def setup_after():
+    return hl.get_lexer('python')
+
+def render_before():
+    return highlight(SOURCE, setup_before(), hl.formatter)
+
+def render_after():
+    return hl.render_highlight(SOURCE, 'python')
+
+def bench(func, number):
+    best = min(timeit.repeat(func, repeat=3, number=number))
+    return best / number * 1e6
+
+def main(number=2000):
+    print 'Setup, per render:  before %8.1f us   after %8.1f us' % (
+        bench(setup_before, number), bench(setup_after, number))
+    print 'Full small render:  before %8.1f us   after %8.1f us' % (
+        bench(render_before, number), bench(render_after, number))
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:2]])
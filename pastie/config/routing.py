@@ -20,15 +20,21 @@ def make_map():
     map.connect('newpaste', '', controller='pasties', action='new')
     map.connect('xmlrpc', '/RPC2/:action/:id', controller='xmlrpc')
 #    map.connect('xmlrpc', '/xmlrpc/', controller='xmlrpc', action='index')
-    map.connect('list', '/list/:id', controller='pasties', action='list', id=1)
-    map.connect('pastetag', '/tag/:id/:page',
-                controller='pastetags', action='show', id=None, page=1)
+    map.connect('list', '/list/:direction/:cursor', controller='pasties',
+                action='list', direction=None, cursor=None)
+    map.connect('pastetag', '/tag/:id/:direction/:cursor',
+                controller='pastetags', action='show', id=None,
+                direction=None, cursor=None)
+    map.connect('tagsuggest', '/tags/suggest', controller='pastetags',
+                action='suggest')
     map.connect('tagcloud', '/tags', controller='pastetags', action='index')
     map.connect('paste', '/:id', controller="pasties", action='show')
     map.connect('pastetree', '/tree/:id', controller='pasties', action='tree')
     map.connect('rawpaste', '/download/:id', controller='pasties', action='download')
     map.connect('diffpaste', '/diff/:id/:parent', controller='pasties', action='diff')
     map.connect('replypaste', '/reply/:id', controller='pasties', action='new')
+    map.connect('pastepreview', '/preview/:id', controller='pasties',
+                action='preview')
 
 
     map.connect(':controller/:action/:id')
@@ -1,22 +1,56 @@
 import logging
 
 from pastie.lib.base import *
-from pastie.lib.paginator import Page
+from pastie.lib.caching import cached
+from pastie.lib.paginator import CounterCount, KeysetPage
+from pastie.lib.tagindex import get_tag_index
+from pastie.model.pasties import paste_table
 
 log = logging.getLogger(__name__)
 
+def tag_generation(id, direction=None, cursor=None):
+    """Generation of the page of the pastes tagged ``id``, see
+    `pastie.controllers.pasties.paste_generation`"""
+    if direction == 'older' and cursor:
+        return None
+    return Tag.generation_for(str(id))
+
 class PastetagsController(BaseController):
 
-    @beaker_cache(key=None, expire=7200, type='memory')
+    # The tag sizes are kept up to date in the tags table, the cloud is
+    # cheap to rebuild and isn't cleared on new pastes
+    @cached(expire=300)
     def index(self):
         c.tag_sizes = Paste.tag_sizes()
         log.debug(c.tag_sizes)
         return render('pastetags.tagcloud')
 
-    @beaker_cache(key='id', expire=3600, type="memory")
-    def show(self, id, page=1):
-        query = Session.query(Paste).filter(Paste.tags.any(name=str(id)))
-        c.paginator = Page(query, current_page=page or 1, items_per_page=25,
-                           sqlalchemy_engine=config['pylons.g'].sa_engine)
+    @jsonify
+    def suggest(self):
+        """The tags starting with the ``q`` parameter, for autocompletion"""
+        prefix = request.params.get('q', '').strip()
+        try:
+            limit = max(1, min(int(request.params.get('limit', 10)), 50))
+        except ValueError:
+            limit = 10
+        if not prefix:
+            return dict(tags=[])
+        return dict(tags=get_tag_index().suggest(prefix, limit))
+
+    @cached(key=['id', 'direction', 'cursor'], expire=3600,
+            generation=tag_generation)
+    def show(self, id, direction=None, cursor=None):
+        query = Paste.query_for('listing').filter(
+            Paste.tags.any(name=str(id)))
+        # The tags keep their number of pastes; not shown on the pages
+        # cached whatever the new pastes, see tag_generation, it would go
+        # stale
+        count = None
+        if not (direction == 'older' and cursor):
+            count = CounterCount(lambda: Tag.paste_count_for(str(id)))
+        c.paginator = KeysetPage(query, [paste_table.c.date, paste_table.c.id],
+                                 cursor, direction, items_per_page=25,
+                                 count=count)
+        Paste.load_tags(c.paginator)
 
         return render('pastetags.show')
@@ -1,19 +1,67 @@
 import re
 import logging
 
+from genshi import XML
+from paste.deploy.converters import asbool
+
 from pastie.lib.base import *
-from pastie.lib.highlight import formatter, langdict
+from pastie.lib.caching import cached
+from pastie.lib.conditional import immutable, make_etag, not_modified, \
+    requested_range, UnsatisfiableRange
+from pastie.lib.highlight import CHUNK_SIZE, formatter
+from pastie.lib.registry import get_registry
+from pastie.lib.tagindex import get_tag_index
 from sqlalchemy import desc, func
-from pastie.lib.paginator import Page
+from pastie.lib.paginator import CappedCount, CounterCount, KeysetPage
+from pastie.model.bodies import iter_body_data
+from pastie.model.common import counter_value
+from pastie.model.pasties import paste_table
 
 log = logging.getLogger(__name__)
 
+# Placeholder for the highlighted code in streamed pages
+CODE_MARKER = '<!-- pastie:code -->'
+
+def paste_generation(direction=None, cursor=None):
+    """Generation of the pastes listing page going ``direction`` from
+    ``cursor``, see `pastie.lib.caching`; pages found by seeking older
+    pastes don't change as new pastes are created, they have none, and
+    don't show the number of pastes"""
+    if direction == 'older' and cursor:
+        return None
+    return counter_value('generation:pastes') or 0
+
+# The number of pastes is kept by the 'pastes' counter, databases set up
+# without it are counted up to 10000 pastes
+PASTE_COUNT = CounterCount(lambda: counter_value('pastes'),
+                           fallback=CappedCount(10000))
+
+def accepts_gzip(accept_encoding):
+    """Whether an ``Accept-Encoding`` header value accepts gzip"""
+    for coding in accept_encoding.split(','):
+        params = coding.split(';')
+        if params[0].strip().lower() not in ('gzip', 'x-gzip'):
+            continue
+        for param in params[1:]:
+            name, _, value = param.partition('=')
+            if name.strip() == 'q':
+                try:
+                    return float(value) > 0
+                except ValueError:
+                    return False
+        return True
+    return False
+
+def iter_chunks(data, chunk_size=CHUNK_SIZE):
+    """Generator of ``data`` in ``chunk_size`` bytes chunks"""
+    for start in xrange(0, len(data), chunk_size):
+        yield data[start:start+chunk_size]
+
 class PastiesController(BaseController):
 
     @rest.dispatch_on(POST="new_POST")
     def new(self, id=None):
         log.debug('On new')
-        c.tags = [str(tag.name) for tag in Session.query(Tag).all()]
         c.author = request.cookies.get('author', '')
         c.language = request.cookies.get('language', '')
         c.public_key = config['spamfilter.recaptcha.public_key']
@@ -39,72 +87,176 @@ class PastiesController(BaseController):
            parent_id = None
         log.debug('Parent ID: %r', parent_id)
         paste = Paste(author, title, language, code, tags, parent_id=parent_id)
+        if asbool(config.get('highlight.render_on_write', True)):
+            # Pastes never change, highlight them once, when they're created
+            Session.flush()
+            paste.render()
+        # Also moves the generations of the cached listings showing the
+        # paste on, see pastie.lib.caching
         Session.commit()
-
-        # Clear the pastes listing
-        log.debug('Clearing pasties list cache')
-        cache.get_cache('pastie.controllers.pasties.list').clear()
-        # Clear the tagcloud
-        log.debug('Clear the tagcloud')
-        cache.get_cache('pastie.controllers.pastetags.index').clear()
-        # Clear the "pastes with tag" cache
-        tagscache = cache.get_cache('pastie.controllers.pastetags.show')
-        for tag in paste.tags:
-            tagscache.remove_value(tag.name)
+        get_tag_index().add([tag.name for tag in paste.tags])
 
         # Set some defaults on user cookie
         response.set_cookie('language', language, expires=31556926)
         response.set_cookie('author', author, expires=31556926)
         redirect_to('paste', id=paste.id)
 
-    def index(self, id=1):
-        redirect_to(action='list', id=id)
+    def index(self, id=None):
+        redirect_to('list')
 
     # One hour cache
-    @beaker_cache(key='id', expire=3600, type="memory")
-    def list(self, id):
-        c.paginator = Page(Session.query(Paste), current_page=id or 1,
-                           items_per_page=25,
-                           sqlalchemy_engine=config['pylons.g'].sa_engine)
+    @cached(key=['direction', 'cursor'], expire=3600,
+            generation=paste_generation)
+    def list(self, direction=None, cursor=None):
+        count = PASTE_COUNT
+        if direction == 'older' and cursor:
+            # Cached whatever the new pastes, see paste_generation, the
+            # count would go stale
+            count = None
+        c.paginator = KeysetPage(Paste.query_for('listing'),
+                                 [paste_table.c.date, paste_table.c.id],
+                                 cursor, direction, items_per_page=25,
+                                 count=count)
+        Paste.load_tags(c.paginator)
         log.debug(c.paginator)
         return render('paste.index')
 
     def show(self, id):
         if not re.match(r'^\d+$', id):
             abort(404)
-        c.langdict = langdict
-        paste = Session.query(Paste).filter_by(id=id).first()
+        c.langdict = get_registry().names
+        paste = Paste.query_for('full').get(int(id))
         if not paste:
             abort(404)
+        if asbool(config.get('highlight.render_on_write', True)) and \
+                paste.needs_render():
+            # Created before rendering on write, rendered by an older
+            # version of the highlighter, or stored as plain text when it
+            # couldn't be highlighted; store a fresh render
+            log.debug('Storing render of paste %s', paste.id)
+            paste.render()
+            Session.commit()
+
+        # The page shows whether the paste has replies, its validator
+        # changes with their count, and with its render. No Last-Modified,
+        # the replies' dates would be needed.
+        response.headers['Cache-Control'] = 'public, no-cache'
+        rendered = paste.rendered
+        if not_modified(make_etag('show', paste.id, paste.body_hash,
+                                  paste.child_count, h.RENDER_VERSION,
+                                  rendered and rendered.version)):
+            return ''
 
         c.paste = paste
         c.styles = formatter.get_style_defs('.syntax')
+        window = h.parse_window(request.params.get('lines'))
+        if window:
+            html, first, last, c.line_count = h.code_window(paste, *window)
+            c.window = XML(html)
+            c.lines = first, last
+            size = last - first + 1
+            c.previous_lines = first > 1 and \
+                '%d-%d' % (max(1, first - size), first - 1) or None
+            c.next_lines = last < c.line_count and \
+                '%d-%d' % (last + 1, last + size) or None
+            return render('paste.show')
+        if asbool(config.get('highlight.streaming', False)):
+            c.code_marker = CODE_MARKER
+            return self._stream_page(render('paste.show'),
+                                     h.iter_code_highlight(paste))
         return render('paste.show')
 
+    def preview(self, id):
+        """The first lines of a paste, highlighted, loaded by the listings
+        when a paste is expanded"""
+        if not re.match(r'^\d+$', id):
+            abort(404)
+        paste = Paste.query_for('code').get(int(id))
+        if not paste:
+            abort(404)
+        c.paste = paste
+        c.preview_lines = int(config.get('listing.preview_lines', 15))
+        return render('paste.preview')
+
     def tree(self, id):
         paste = Paste.resolve_root(int(id))
         if not paste:
             abort(404)
         c.paste = paste
+        c.replies = paste.family()
         c.id = int(id)
         return render('paste.tree')
 
     def download(self, id):
         if not id:
             redirect_to('list')
-        paste = Session.query(Paste).get(int(id))
+        paste = Paste.query_for('validators').get(int(id))
         if not paste:
             abort(404)
 
-        mimetype = h.get_lexer_by_name(paste.language or 'text').mimetypes[0]
-        response.content_type__set(mimetype)
+        # Loaded without its data, see pastie.model.bodies
+        body = paste.body
+        response.content_type__set(get_registry().mimetype(paste.language))
         response.charset__set('utf-8')
-        response.write(paste.code)
-        return
+        response.headers['Vary'] = 'Accept-Encoding'
+        response.headers['Accept-Ranges'] = 'bytes'
+        immutable()
+        # Stored compressed, send it as is to the clients accepting it; the
+        # ranges requested are then of the compressed data
+        gzip = body.stored_as('gzip') and \
+            accepts_gzip(request.environ.get('HTTP_ACCEPT_ENCODING', ''))
+        etag = make_etag('download', paste.body_hash, paste.language,
+                         gzip and 'gzip' or 'identity')
+        if not_modified(etag, paste.date):
+            return ''
+        if gzip:
+            response.headers['Content-Encoding'] = 'gzip'
+            length = body.data_length()
+        else:
+            length = body.encoded_length()
+
+        try:
+            start, stop = requested_range(length, etag, paste.date) or \
+                (0, length)
+        except UnsatisfiableRange:
+            response.status_code = 416
+            response.headers['Content-Range'] = 'bytes */%d' % length
+            return ''
+        if stop - start < length:
+            response.status_code = 206
+            response.headers['Content-Range'] = \
+                'bytes %d-%d/%d' % (start, stop - 1, length)
+        response.headers['Content-Length'] = str(stop - start)
+        if request.environ['REQUEST_METHOD'] == 'HEAD':
+            return ''
+        if gzip or body.stored_as('utf-8'):
+            # Sent as stored, straight from the database
+            return iter_body_data(body.hash, start, stop)
+        return iter_chunks(body.text.encode('utf-8')[start:stop])
+
+    def _stream_page(self, page, chunks):
+        """Generator sending ``page`` with the ``chunks`` of highlighted code
+        in place of `CODE_MARKER`, as they're produced"""
+        if isinstance(page, unicode):
+            page = page.encode('utf-8')
+        head, tail = page.split(CODE_MARKER, 1)
+        yield head
+        for chunk in chunks:
+            yield chunk
+        yield tail
 
-    @beaker_cache(expire='never', type='memory') # don't expire cache
     def diff(self, id=None, parent=None):
-        c.langdict = langdict
-        c.paste = Session.query(Paste).get(int(id))
-        c.parent = Session.query(Paste).get(int(parent))
+        if not re.match(r'^\d+$', id) or not re.match(r'^\d+$', parent):
+            abort(404)
+        c.langdict = get_registry().names
+        query = Paste.query_for('validators')
+        c.paste = query.get(int(id))
+        c.parent = query.get(int(parent))
+        if not c.paste or not c.parent:
+            abort(404)
+        immutable()
+        if not_modified(make_etag('diff', c.paste.body_hash, c.paste.language,
+                                  c.parent.body_hash, h.RENDER_VERSION),
+                        max(c.paste.date, c.parent.date)):
+            return ''
         return render('paste.diff')
@@ -1,9 +1,11 @@
 import logging
 
+from paste.deploy.converters import asbool
+
 from pastie.lib.base import *
 from pylons.controllers import XMLRPCController
-from pygments.util import ClassNotFound
-from pygments.lexers import get_lexer_for_filename, get_lexer_for_mimetype, guess_lexer
+from pastie.lib.detect import detect_language
+from pastie.lib.tagindex import get_tag_index
 
 log = logging.getLogger(__name__)
 
@@ -26,29 +28,15 @@ class XmlrpcController(XMLRPCController):
         if isinstance(tags, (tuple, list)):
             tags = ' '.join(tags)
 
-        def get_language_for(filename, mimetype):
-            try:
-                lexer = get_lexer_for_mimetype(mimetype)
-                log.debug('could not get lexer from mimetype')
-            except ClassNotFound:
-                try:
-                    lexer = get_lexer_for_filename(filename)
-                except:
-                    log.debug('could not get lexer from filename')
-                    try:
-                        lexer = guess_lexer(code)
-                    except:
-                        log.debug('could not guess lexer')
-                        return 'text'
-            log.debug(lexer)
-            for alias in lexer.aliases:
-                if alias in h.get_lexers():
-                    return alias
-            return 'text'
-        language = get_language_for(filename or '', mimetype or '')
+        language, rule = detect_language(code, filename, mimetype)
+        log.debug('Detected %s code by %s', language, rule)
 
         paste = Paste(author, title, language, code, tags)
+        if asbool(config.get('highlight.render_on_write', True)):
+            Session.flush()
+            paste.render()
         Session.commit()
+        get_tag_index().add([tag.name for tag in paste.tags])
         return h.url_for('paste', id=paste.id, qualified=True)
 
 
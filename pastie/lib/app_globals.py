@@ -1,6 +1,12 @@
 """The application's Globals object"""
+import os.path
+
 from pylons import config
 
+from pastie.lib.caching import PageCaches
+from pastie.lib.highlightpool import HighlightPool
+from pastie.lib.store import LRUStore
+
 class Globals(object):
     """Globals acts as a container for objects available throughout the
     life of the application
@@ -11,4 +17,47 @@ class Globals(object):
         initialization and is available during requests via the 'g'
         variable
         """
-        pass
+        # Highlighting engine, see pastie.lib.highlightpool
+        self.highlighter = HighlightPool(
+            processes=int(config.get('highlight.processes', 0)),
+            timeout=float(config.get('highlight.timeout', 10)),
+            max_size=int(config.get('highlight.max_size', 512*1024)))
+
+        # Highlighted code, keyed by content, shared by all the processes
+        self.highlight_cache = self._store('highlight', 64*1024*1024)
+
+        # Computed diffs, keyed by the pair of pastes compared
+        self.diff_cache = self._store('diff', 32*1024*1024)
+
+        # Cached pages, by action, see pastie.lib.caching
+        self.page_caches = self._page_caches(16*1024*1024)
+
+    def _store(self, name, size):
+        """The `LRUStore` configured by the ``<name>.cache_file`` and
+        ``<name>.cache_size`` options, kept in ``<name>.db`` in the cache
+        directory by default"""
+        cache_file = config.get('%s.cache_file' % name)
+        if not cache_file and config.get('cache_dir'):
+            cache_file = os.path.join(config['cache_dir'], '%s.db' % name)
+        if not cache_file:
+            return None
+        return LRUStore(cache_file,
+                        int(config.get('%s.cache_size' % name, size)),
+                        table=name)
+
+    def _page_caches(self, size):
+        """The `PageCaches` configured by the ``page.cache_file`` and
+        ``page.cache_size`` options, the latter being the budget of each
+        action's cache unless it has its own, e.g.
+        ``page.cache_size.pasties.list``"""
+        cache_file = config.get('page.cache_file')
+        if not cache_file and config.get('cache_dir'):
+            cache_file = os.path.join(config['cache_dir'], 'pages.db')
+        if not cache_file:
+            return None
+        prefix = 'page.cache_size.'
+        sizes = dict((name[len(prefix):], int(value))
+                     for name, value in config.items()
+                     if name.startswith(prefix))
+        return PageCaches(cache_file,
+                          int(config.get('page.cache_size', size)), sizes)
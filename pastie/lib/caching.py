@@ -0,0 +1,168 @@
+"""Caching of the pages, shared by the processes, invalidated by generations
+
+Beaker's memory caches are kept by each process: with several workers every
+page is computed and held once per worker, and clearing a cache in one
+worker leaves the others serving the stale pages. The `cached` decorator
+keeps the pages in `PageCaches` instead, one `LRUStore` table per action in
+a sqlite database every process on the host shares, each with its own byte
+budget. Without a cache directory configured it falls back to Beaker's
+memory caches.
+
+Clearing a whole cache whenever a paste is created would leave it cold
+under a steady flow of pastes. Instead, the pages are cached along with the
+generation of what they show, a counter kept in the database and bumped by
+every write affecting it, see `pastie.model.pasties.PasteCounts` and the
+tags' ``generation``. A page cached for an older generation is computed
+again, by whichever process serves it first, as soon as the generation
+moves on; the pages a write doesn't affect keep being served from the
+cache.
+"""
+import re
+import time
+import inspect
+import logging
+import cPickle as pickle
+
+import pylons
+from decorator import decorator
+from paste.deploy.converters import asbool
+
+from pastie.lib.store import LRUStore
+
+log = logging.getLogger(__name__)
+
+__all__ = ['cached', 'PageCaches']
+
+class PageCache(object):
+    """Cached responses of one action, with their expiration times, kept
+    in an `LRUStore`"""
+
+    def __init__(self, store):
+        self.store = store
+
+    def get(self, key):
+        data = self.store.get(key)
+        if data is None:
+            return None
+        expires, entry = pickle.loads(data)
+        if expires is not None and expires < time.time():
+            return None
+        return entry
+
+    def set(self, key, entry, expire=None):
+        expires = expire is not None and time.time() + expire or None
+        self.store.set(key, pickle.dumps((expires, entry),
+                                         pickle.HIGHEST_PROTOCOL))
+
+    def remove(self, key):
+        self.store.remove(key)
+
+class BeakerPageCache(object):
+    """`PageCache` interface to a Beaker cache, kept by the process"""
+
+    def __init__(self, namespace):
+        self.cache = pylons.cache.get_cache(namespace)
+
+    def get(self, key):
+        try:
+            return self.cache.get_value(key, type='memory')
+        except KeyError:
+            return None
+
+    def set(self, key, entry, expire=None):
+        self.cache.set_value(key, entry, type='memory', expiretime=expire)
+
+    def remove(self, key):
+        self.cache.remove_value(key)
+
+class PageCaches(object):
+    """The `PageCache` of each action, in one sqlite database
+
+    ``filename``
+        Path of the sqlite database, see `LRUStore`.
+
+    ``max_bytes``
+        Budget of each action's cache.
+
+    ``sizes``
+        Budgets of some actions' caches, by action name, e.g.
+        ``pasties.list``.
+    """
+
+    def __init__(self, filename, max_bytes, sizes=None):
+        self.filename = filename
+        self.max_bytes = max_bytes
+        self.sizes = sizes or {}
+        self.caches = {}
+
+    def get(self, name):
+        """Return the `PageCache` of action ``name``"""
+        cache = self.caches.get(name)
+        if cache is None:
+            table = 'pages_' + re.sub(r'\W', '_', name)
+            cache = self.caches[name] = PageCache(LRUStore(
+                self.filename, self.sizes.get(name, self.max_bytes), table))
+        return cache
+
+def page_cache(name):
+    """The cache of the pages of action ``name``: the application's
+    `PageCaches` one if configured, Beaker's memory cache otherwise"""
+    caches = getattr(pylons.config.get('pylons.g'), 'page_caches', None)
+    if caches is not None:
+        return caches.get(name)
+    return BeakerPageCache(name)
+
+def cached(key=None, expire=None, generation=None):
+    """Cache the action's response, like ``beaker_cache``, see `page_cache`
+
+    ``key``
+        List of the names of the arguments the cache is keyed by.
+
+    ``expire``
+        Seconds before a cached page expires, whatever its generation.
+
+    ``generation``
+        Called with the action's arguments, returns the current generation
+        of the page, the page is computed again if it was cached for
+        another generation. ``None`` for the pages which don't change with
+        the writes.
+    """
+    def wrapper(func, *args, **kwargs):
+        if not asbool(pylons.config.get('cache_enabled', 'True')):
+            return func(*args, **kwargs)
+        arguments = _arguments(func, args, kwargs)
+        cache_key = ' '.join(['%s=%s' % (name, arguments[name])
+                              for name in key or ()]) or func.__name__
+        name = '%s.%s' % (func.__module__.rsplit('.', 1)[-1], func.__name__)
+        cache = page_cache(name)
+        current = generation and generation(**arguments)
+
+        response = cache.get(cache_key)
+        if response is not None and response['generation'] != current:
+            log.debug('%s %s is at generation %s, was cached for %s', name,
+                      cache_key, current, response['generation'])
+            response = None
+        if response is None:
+            content = func(*args, **kwargs)
+            glob_response = pylons.response._current_obj()
+            # Replaces the entry cached for another generation
+            cache.set(cache_key, dict(headers=glob_response.headers,
+                                      status=glob_response.status_code,
+                                      cookies=glob_response.cookies,
+                                      content=content, generation=current),
+                      expire)
+            return content
+        glob_response = pylons.response._current_obj()
+        glob_response.headers = response['headers']
+        glob_response.status_code = response['status']
+        glob_response.cookies = response['cookies']
+        return response['content']
+    return decorator(wrapper)
+
+def _arguments(func, args, kwargs):
+    """The arguments of the call of ``func``, by name, but ``self``"""
+    arguments = kwargs.copy()
+    for name, value in zip(inspect.getargspec(func)[0], args):
+        if name != 'self':
+            arguments[name] = value
+    return arguments
@@ -0,0 +1,157 @@
+"""HTTP conditional requests
+
+Pastes never change once created, so their pages can carry validators, an
+``ETag`` and a ``Last-Modified`` date, and the requests of clients already
+holding the current version answered with a bodiless ``304 Not Modified``,
+see `not_modified`. The downloads and the diffs don't change at all and are
+also sent as `immutable`, letting the browsers and the proxies keep them
+without asking again.
+
+The downloads can also be requested in part, see `requested_range`, to
+resume them.
+
+``pylons.controllers.util.etag_cache`` isn't used: it compares the
+``If-None-Match`` header to the key as is, ignoring lists of tags, weak tags
+and ``*``, and the 304 it raises loses the headers set on the response.
+"""
+import time
+import hashlib
+from email.utils import formatdate, mktime_tz, parsedate_tz
+
+import pylons
+
+__all__ = ['make_etag', 'immutable', 'not_modified', 'requested_range',
+           'UnsatisfiableRange']
+
+# A year, the longest max-age HTTP/1.1 caches are expected to honour
+IMMUTABLE_MAX_AGE = 31536000
+
+def make_etag(*parts):
+    """A strong entity tag for the representation made out of ``parts``"""
+    key = u'\0'.join([unicode(part) for part in parts]).encode('utf-8')
+    return '"%s"' % hashlib.sha1(key).hexdigest()[:24]
+
+def http_date(value):
+    """Format the local time datetime ``value`` as an HTTP date"""
+    return formatdate(time.mktime(value.timetuple()), usegmt=True)
+
+def parse_http_date(value):
+    """The seconds since the epoch of HTTP date ``value``, or ``None`` if
+    it can't be parsed"""
+    parsed = value and parsedate_tz(value.split(';', 1)[0])
+    if not parsed:
+        return None
+    try:
+        return mktime_tz(parsed)
+    except (OverflowError, ValueError):
+        return None
+
+class UnsatisfiableRange(Exception):
+    """None of the bytes requested are in the representation"""
+
+def etag_matches(header, etag):
+    """Whether the ``If-None-Match`` header value ``header`` lists
+    ``etag``, comparing them weakly as required for that header"""
+    if header.strip() == '*':
+        return True
+    if etag.startswith('W/'):
+        etag = etag[2:]
+    for tag in header.split(','):
+        tag = tag.strip()
+        if tag.startswith('W/'):
+            tag = tag[2:]
+        if tag == etag:
+            return True
+    return False
+
+def not_modified(etag, last_modified=None):
+    """Set the validators of the response, entity tag ``etag`` and the
+    local time datetime ``last_modified``, and check them against the
+    request's. Returns ``True``, with the response status set to 304, if
+    the client's copy is current; the action should then return an empty
+    body.
+
+    ``If-None-Match`` takes precedence over ``If-Modified-Since``, which is
+    only looked at without it, as HTTP/1.1 requires."""
+    response = pylons.response._current_obj()
+    environ = pylons.request.environ
+    response.headers['ETag'] = etag
+    if last_modified is not None:
+        response.headers['Last-Modified'] = http_date(last_modified)
+    if environ.get('REQUEST_METHOD', 'GET') not in ('GET', 'HEAD'):
+        return False
+
+    if_none_match = environ.get('HTTP_IF_NONE_MATCH')
+    if if_none_match is not None:
+        current = etag_matches(if_none_match, etag)
+    else:
+        since = parse_http_date(environ.get('HTTP_IF_MODIFIED_SINCE'))
+        current = since is not None and last_modified is not None and \
+            int(time.mktime(last_modified.timetuple())) <= since
+    if current:
+        response.status_code = 304
+        # Pylons' default, a 304 has no body to describe
+        response.headers.pop('Content-Type', None)
+    return current
+
+def immutable(max_age=None):
+    """Let any cache keep the response for ``max_age`` seconds,
+    ``http.immutable_max_age`` by default, without revalidating it"""
+    if max_age is None:
+        max_age = int(pylons.config.get('http.immutable_max_age',
+                                        IMMUTABLE_MAX_AGE))
+    headers = pylons.response.headers
+    headers['Cache-Control'] = 'public, max-age=%d, immutable' % max_age
+    # What the HTTP/1.0 caches go by, rather than Pylons' default Pragma
+    headers['Expires'] = formatdate(time.time() + max_age, usegmt=True)
+    headers.pop('Pragma', None)
+
+def parse_range(header, length):
+    """The ``(start, stop)`` bytes of a ``length`` bytes long representation
+    requested by the ``Range`` header value ``header``, or ``None`` to send
+    all of it: the header is ignored if it can't be parsed, and so are the
+    requests of several ranges. Raises `UnsatisfiableRange` if the range
+    starts past the end."""
+    unit, _, spec = header.partition('=')
+    if unit.strip() != 'bytes' or ',' in spec:
+        return None
+    first, dash, last = spec.strip().partition('-')
+    if not dash:
+        return None
+    try:
+        if not first:
+            # The last bytes
+            count = int(last)
+            if count <= 0:
+                raise UnsatisfiableRange(header)
+            return max(0, length - count), length
+        start = int(first)
+        stop = last and int(last) + 1 or None
+    except ValueError:
+        return None
+    if stop is not None and stop <= start:
+        return None
+    if start >= length:
+        raise UnsatisfiableRange(header)
+    return start, min(stop or length, length)
+
+def requested_range(length, etag, last_modified=None):
+    """The ``(start, stop)`` bytes of the representation, ``length`` bytes
+    long, the request asks for, see `parse_range`, ``None`` for all of it.
+
+    A range requested ``If-Range`` the representation is still the one the
+    client has, by entity tag or date, is ignored when it isn't."""
+    environ = pylons.request.environ
+    header = environ.get('HTTP_RANGE')
+    if not header or environ.get('REQUEST_METHOD', 'GET') != 'GET':
+        return None
+    if_range = environ.get('HTTP_IF_RANGE', '').strip()
+    if if_range:
+        if if_range.startswith('"') or if_range.startswith('W/'):
+            # Strong comparison, weak tags never match
+            if if_range != etag:
+                return None
+        elif last_modified is None or \
+                if_range != http_date(last_modified):
+            return None
+    return parse_range(header, length)
@@ -0,0 +1,63 @@
+"""Line deltas between pastes
+
+A reply usually differs from the paste it answers by a few lines, so it can
+be stored as a delta against it. A delta is a list of instructions, each
+one either a ``[start, count]`` pair, copy ``count`` lines of the base from
+line ``start``, or a string, insert it. It's stored as JSON.
+"""
+import simplejson
+
+from pastie.lib.diff import DiffTooLarge, intern_lines, matching_blocks
+
+__all__ = ['apply_delta', 'delta_blocks', 'make_delta']
+
+def make_delta(base, text, max_work=None):
+    """Return the delta from ``base`` to ``text``, or ``None`` if they're
+    too different for it to be smaller than ``text`` itself or to be
+    computed within ``max_work`` steps, see `pastie.lib.diff`"""
+    base_lines = base.splitlines(True)
+    lines = text.splitlines(True)
+    try:
+        base_ids, ids = intern_lines(base_lines, lines)
+        blocks = matching_blocks(base_ids, ids, max_work)
+    except DiffTooLarge:
+        return None
+    delta = []
+    j = 0
+    for start, line, count in blocks:
+        if line > j:
+            delta.append(u''.join(lines[j:line]))
+        if count:
+            delta.append([start, count])
+        j = line + count
+    delta = simplejson.dumps(delta, separators=(',', ':'))
+    if len(delta) >= len(text):
+        return None
+    return delta
+
+def apply_delta(base, delta):
+    """Rebuild the text ``delta`` was made from, out of ``base``"""
+    base_lines = base.splitlines(True)
+    text = []
+    for instruction in simplejson.loads(delta):
+        if isinstance(instruction, list):
+            start, count = instruction
+            text.extend(base_lines[start:start + count])
+        else:
+            text.append(instruction)
+    return u''.join(text)
+
+def delta_blocks(delta):
+    """The ``(base line, line, count)`` blocks of lines ``delta`` copies
+    from its base, in the order `pastie.lib.diff.matching_blocks` returns
+    them, without the final ``(len(a), len(b), 0)`` one"""
+    blocks = []
+    line = 0
+    for instruction in simplejson.loads(delta):
+        if isinstance(instruction, list):
+            start, count = instruction
+            blocks.append((start, line, count))
+            line += count
+        else:
+            line += len(instruction.splitlines(True))
+    return blocks
@@ -0,0 +1,164 @@
+"""Language detection for the pastes submitted over XML-RPC
+
+Pygments' own lookups walk every lexer's patterns for each filename or
+mimetype and ``guess_lexer`` runs every lexer's ``analyse_text`` over the
+whole code. The `LanguageDetector` instead indexes the lexer registry's
+filename patterns and mimetypes in dictionaries once, and only sniffs a
+bounded sample of the start of the code.
+
+Detection goes through these rules, the first one matching wins:
+
+``mimetype``
+    The mimetype is one of a lexer's.
+``filename``
+    The filename matches one of a lexer's patterns; when several lexers
+    match, the sample picks the one, as with ``get_lexer_for_filename``.
+``shebang``
+    The sample starts with a ``#!`` line naming a known interpreter.
+``content``
+    ``guess_lexer`` on the sample.
+``default``
+    Nothing matched, the paste is plain text.
+"""
+import os
+import re
+import logging
+from fnmatch import fnmatchcase
+
+from pylons import config
+from pygments.lexers import find_lexer_class, guess_lexer
+from pygments.util import ClassNotFound
+
+from pastie.lib.registry import get_registry
+
+log = logging.getLogger(__name__)
+
+__all__ = ['detect_language', 'LanguageDetector']
+
+GLOB_CHARS = re.compile(r'[*?\[]')
+
+SHEBANG_RE = re.compile(r'^#!\s*(\S+)(.*)$', re.MULTILINE)
+
+class LanguageDetector(object):
+    """Detect the language of some code from its metadata and a sample
+
+    ``registry``
+        The `pastie.lib.registry.LexerRegistry` to index.
+
+    ``sample_size``
+        Number of characters, from the start of the code, content sniffing
+        looks at.
+    """
+
+    def __init__(self, registry, sample_size=4096):
+        self.sample_size = sample_size
+        self.mimetypes = {}     # mimetype -> language
+        self.filenames = {}     # exact filename -> [(language, pattern)]
+        self.suffixes = {}      # '.ext' -> [(language, pattern)]
+        self.globs = []         # [(pattern, language)]
+        self.aliases = {}       # any alias -> language
+        self.lexer_names = {}   # language -> lexer name
+        for name, aliases, filenames, mimetypes in registry.lexers:
+            language = aliases[0]
+            self.lexer_names[language] = name
+            for alias in aliases:
+                self.aliases.setdefault(alias, language)
+            for mimetype in mimetypes:
+                self.mimetypes.setdefault(mimetype, language)
+            for pattern in filenames:
+                if not GLOB_CHARS.search(pattern):
+                    self.filenames.setdefault(pattern, []).append(
+                        (language, pattern))
+                elif pattern.startswith('*.') and \
+                        not GLOB_CHARS.search(pattern[1:]):
+                    self.suffixes.setdefault(pattern[1:], []).append(
+                        (language, pattern))
+                else:
+                    self.globs.append((pattern, language))
+
+    def detect(self, code, filename='', mimetype=''):
+        """Return ``(language, rule)``, the language of ``code`` and the
+        name of the rule which found it"""
+        if mimetype in self.mimetypes:
+            return self.mimetypes[mimetype], 'mimetype'
+        sample = code[:self.sample_size]
+        if filename:
+            language = self.for_filename(filename, sample)
+            if language:
+                return language, 'filename'
+        language = self.for_shebang(sample)
+        if language:
+            return language, 'shebang'
+        language = self.for_content(sample)
+        if language:
+            return language, 'content'
+        return 'text', 'default'
+
+    def for_filename(self, filename, sample=None):
+        """Language whose patterns match ``filename``, or ``None``"""
+        basename = os.path.basename(filename)
+        matches = list(self.filenames.get(basename, ()))
+        dot = basename.find('.', 1)
+        while dot != -1:
+            matches.extend(self.suffixes.get(basename[dot:], ()))
+            dot = basename.find('.', dot + 1)
+        for pattern, language in self.globs:
+            if fnmatchcase(basename, pattern):
+                matches.append((language, pattern))
+        if not matches:
+            return None
+        if len(set(language for language, _ in matches)) == 1:
+            return matches[0][0]
+        return max(matches, key=lambda match: self._rate(match, sample))[0]
+
+    def _rate(self, match, sample):
+        """The rating ``get_lexer_for_filename`` gives a matching lexer"""
+        language, pattern = match
+        cls = find_lexer_class(self.lexer_names[language])
+        # explicit patterns get a bonus
+        bonus = '*' not in pattern and 0.5 or 0
+        if sample:
+            return cls.analyse_text(sample) + bonus, cls.__name__
+        return cls.priority + bonus, cls.__name__
+
+    def for_shebang(self, sample):
+        """Language of the interpreter named on the sample's ``#!`` line,
+        or ``None``"""
+        match = SHEBANG_RE.match(sample)
+        if match is None:
+            return None
+        interpreter = os.path.basename(match.group(1))
+        if interpreter == 'env':
+            args = [arg for arg in match.group(2).split()
+                    if not arg.startswith('-') and '=' not in arg]
+            if not args:
+                return None
+            interpreter = os.path.basename(args[0])
+        # python2.7 -> python
+        for name in (interpreter, interpreter.rstrip('0123456789.')):
+            if name in self.aliases:
+                return self.aliases[name]
+        return None
+
+    def for_content(self, sample):
+        """Language ``guess_lexer`` finds for the sample, or ``None``"""
+        if not sample.strip():
+            return None
+        try:
+            lexer = guess_lexer(sample)
+        except ClassNotFound:
+            return None
+        for alias in lexer.aliases:
+            if alias in self.aliases:
+                return self.aliases[alias]
+        return None
+
+_detector = None
+
+def detect_language(code, filename='', mimetype=''):
+    """Detect the language of ``code``, see `LanguageDetector.detect`"""
+    global _detector
+    if _detector is None:
+        _detector = LanguageDetector(
+            get_registry(), int(config.get('detect.sample_size', 4096)))
+    return _detector.detect(code, filename or '', mimetype or '')
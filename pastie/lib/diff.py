@@ -0,0 +1,223 @@
+"""Line diffs of pastes
+
+`difflib` is quadratic prone on big, dissimilar inputs. `unified_diff`
+writes the same format as ``difflib.unified_diff`` but compares the lines,
+mapped to integers, with the linear space variation of Myers' O(ND)
+algorithm, which finds a shortest edit script, and gives up, raising
+`DiffTooLarge`, when the comparison goes over a work budget instead of
+keeping the worker busy.
+"""
+
+__all__ = ['DiffTooLarge', 'unified_diff']
+
+class DiffTooLarge(Exception):
+    """The inputs differ too much to be compared within the work budget"""
+
+def intern_lines(a, b):
+    """Map the lines of ``a`` and ``b`` to integers, equal lines to the
+    same integer"""
+    ids = {}
+    return ([ids.setdefault(line, len(ids)) for line in a],
+            [ids.setdefault(line, len(ids)) for line in b])
+
+class _Budget(object):
+
+    def __init__(self, limit):
+        self.limit = limit
+        self.work = 0
+
+    def spend(self, amount):
+        self.work += amount
+        if self.limit and self.work > self.limit:
+            raise DiffTooLarge('Comparison went over %d steps' % self.limit)
+
+def _middle_snake(a, b, alo, ahi, blo, bhi, budget):
+    """Return ``(x, y, u, v)``, the middle snake of an optimal path between
+    ``a[alo:ahi]`` and ``b[blo:bhi]``, going from ``(x, y)`` to ``(u, v)``"""
+    n = ahi - alo
+    m = bhi - blo
+    delta = n - m
+    odd = delta & 1
+    # furthest reaching x, by diagonal k = x - y, forward from the top
+    # left and backward from the bottom right corner
+    forward = {1: 0}
+    backward = {1: 0}
+    for d in xrange((n + m + 1) // 2 + 1):
+        work = 0
+        for k in xrange(-d, d + 1, 2):
+            if k == -d or (k != d and forward[k - 1] < forward[k + 1]):
+                x = forward[k + 1]
+            else:
+                x = forward[k - 1] + 1
+            y = x - k
+            x0, y0 = x, y
+            while x < n and y < m and a[alo + x] == b[blo + y]:
+                x += 1
+                y += 1
+            forward[k] = x
+            work += x - x0
+            if odd and -d < delta - k < d and x + backward[delta - k] >= n:
+                return alo + x0, blo + y0, alo + x, blo + y
+        for k in xrange(-d, d + 1, 2):
+            if k == -d or (k != d and backward[k - 1] < backward[k + 1]):
+                x = backward[k + 1]
+            else:
+                x = backward[k - 1] + 1
+            y = x - k
+            x0, y0 = x, y
+            while x < n and y < m and a[ahi - 1 - x] == b[bhi - 1 - y]:
+                x += 1
+                y += 1
+            backward[k] = x
+            work += x - x0
+            if not odd and -d <= delta - k <= d and \
+                    x + forward[delta - k] >= n:
+                return ahi - x, bhi - y, ahi - x0, bhi - y0
+        budget.spend(work + 2 * d + 2)
+    raise AssertionError('no middle snake found')
+
+def _discard(a, b):
+    """Drop the elements of ``a`` and ``b`` which don't appear in the other
+    sequence, they can't be part of a match. Returns the remaining elements
+    and their indices in the original sequences."""
+    common = set(a).intersection(b)
+    ia = [i for i, value in enumerate(a) if value in common]
+    ib = [i for i, value in enumerate(b) if value in common]
+    return [a[i] for i in ia], [b[i] for i in ib], ia, ib
+
+def matching_blocks(a, b, max_work=None):
+    """Return the ``(i, j, size)`` blocks of equal elements of the
+    sequences ``a`` and ``b``, like
+    ``difflib.SequenceMatcher.get_matching_blocks`` does, the last one
+    being ``(len(a), len(b), 0)``. Raises `DiffTooLarge` if it takes over
+    ``max_work`` steps."""
+    budget = _Budget(max_work)
+    blocks = []
+    sentinel = (len(a), len(b), 0)
+    a, b, ia, ib = _discard(a, b)
+    pending = [(0, len(a), 0, len(b))]
+    while pending:
+        alo, ahi, blo, bhi = pending.pop()
+        # common prefix and suffix
+        start = alo
+        while alo < ahi and blo < bhi and a[alo] == b[blo]:
+            alo += 1
+            blo += 1
+        if alo > start:
+            blocks.append((start, blo - (alo - start), alo - start))
+        end = ahi
+        while alo < ahi and blo < bhi and a[ahi - 1] == b[bhi - 1]:
+            ahi -= 1
+            bhi -= 1
+        if end > ahi:
+            blocks.append((ahi, bhi, end - ahi))
+        budget.spend(ahi - alo + bhi - blo)
+        if alo == ahi or blo == bhi:
+            continue
+        x, y, u, v = _middle_snake(a, b, alo, ahi, blo, bhi, budget)
+        if u > x:
+            blocks.append((x, y, u - x))
+        pending.append((alo, x, blo, y))
+        pending.append((u, ahi, v, bhi))
+
+    blocks.sort()
+    # back to the indices in the original sequences, merging the adjacent
+    # matches
+    merged = []
+    for i, j, size in blocks:
+        for offset in xrange(size):
+            i1, j1 = ia[i + offset], ib[j + offset]
+            if merged and merged[-1][0] + merged[-1][2] == i1 and \
+                    merged[-1][1] + merged[-1][2] == j1:
+                merged[-1][2] += 1
+            else:
+                merged.append([i1, j1, 1])
+    merged = [tuple(block) for block in merged]
+    merged.append(sentinel)
+    return merged
+
+def opcodes(blocks):
+    """``difflib.SequenceMatcher.get_opcodes`` for ``blocks``"""
+    i = j = 0
+    codes = []
+    for ai, bj, size in blocks:
+        tag = ''
+        if i < ai and j < bj:
+            tag = 'replace'
+        elif i < ai:
+            tag = 'delete'
+        elif j < bj:
+            tag = 'insert'
+        if tag:
+            codes.append((tag, i, ai, j, bj))
+        i, j = ai + size, bj + size
+        if size:
+            codes.append(('equal', ai, i, bj, j))
+    return codes
+
+def grouped_opcodes(codes, n=3):
+    """``difflib.SequenceMatcher.get_grouped_opcodes`` for ``codes``"""
+    if not codes:
+        codes = [('equal', 0, 1, 0, 1)]
+    # Fixup leading and trailing groups if they show no changes.
+    if codes[0][0] == 'equal':
+        tag, i1, i2, j1, j2 = codes[0]
+        codes[0] = tag, max(i1, i2 - n), i2, max(j1, j2 - n), j2
+    if codes[-1][0] == 'equal':
+        tag, i1, i2, j1, j2 = codes[-1]
+        codes[-1] = tag, i1, min(i2, i1 + n), j1, min(j2, j1 + n)
+
+    nn = n + n
+    group = []
+    for tag, i1, i2, j1, j2 in codes:
+        # End the current group and start a new one whenever
+        # there is a large range with no changes.
+        if tag == 'equal' and i2 - i1 > nn:
+            group.append((tag, i1, min(i2, i1 + n), j1, min(j2, j1 + n)))
+            yield group
+            group = []
+            i1, j1 = max(i1, i2 - n), max(j1, j2 - n)
+        group.append((tag, i1, i2, j1, j2))
+    if group and not (len(group) == 1 and group[0][0] == 'equal'):
+        yield group
+
+def _format_range(start, stop):
+    """Unified diff hunk range, as ``difflib`` writes it"""
+    beginning = start + 1
+    length = stop - start
+    if length == 1:
+        return '%d' % beginning
+    if not length:
+        beginning -= 1
+    return '%d,%d' % (beginning, length)
+
+def unified_diff(a, b, fromfile='', tofile='', n=3, max_work=None,
+                 blocks=None):
+    """Compare the lists of lines ``a`` and ``b``, returning the lines,
+    without line terminators, of their unified diff with ``n`` lines of
+    context. Raises `DiffTooLarge` if the comparison takes over
+    ``max_work`` steps.
+
+    The comparison is skipped if their matching ``blocks`` are already
+    known, see `matching_blocks`."""
+    if blocks is None:
+        ia, ib = intern_lines(a, b)
+        blocks = matching_blocks(ia, ib, max_work)
+    codes = opcodes(blocks)
+    lines = []
+    for group in grouped_opcodes(codes, n):
+        if not lines:
+            lines.append('--- %s' % fromfile)
+            lines.append('+++ %s' % tofile)
+        first, last = group[0], group[-1]
+        lines.append('@@ -%s +%s @@' % (_format_range(first[1], last[2]),
+                                        _format_range(first[3], last[4])))
+        for tag, i1, i2, j1, j2 in group:
+            if tag == 'equal':
+                lines.extend([' ' + line for line in a[i1:i2]])
+                continue
+            if tag in ('replace', 'delete'):
+                lines.extend(['-' + line for line in a[i1:i2]])
+            if tag in ('replace', 'insert'):
+                lines.extend(['+' + line for line in b[j1:j2]])
+    return lines
@@ -5,4 +5,5 @@ available to Controllers. This module is available to both as 'h'.
 """
 from pylonsgenshi.helpers import *
 from pastie.lib.highlight import *
+from pastie.lib.windowing import *
 from webhelpers.rails.secure_form_tag import authentication_token
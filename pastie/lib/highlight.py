@@ -1,15 +1,41 @@
+import pygments
 from pygments import highlight
-from pygments.lexers import get_lexer_by_name, get_all_lexers
+from pygments.lexers import get_lexer_by_name
 from pygments.formatters import HtmlFormatter
 from genshi import XML
-import StringIO
-from pylons.decorators.cache import beaker_cache
+from cgi import escape
+import time
+import hashlib
+from pylons import config
 
-__all__ = ['code_highlight', 'get_lexers', 'get_lexer_by_name']
+from pastie.lib.registry import get_registry
 
-langdict = {}
-for lang in get_all_lexers():
-    langdict[lang[1][0]] = lang[0]
+__all__ = ['code_highlight', 'get_lexers', 'get_lexer_by_name', 'render_code',
+           'highlight_source', 'render_plain', 'iter_code_highlight',
+           'iter_highlight_source', 'stored_render', 'CodeTooLarge',
+           'HighlightFailed', 'FALLBACK_VERSION', 'OVERSIZE_VERSION',
+           'RENDER_VERSION']
+
+# Stamp stored along with pre-rendered pastes, bump the revision whenever
+# the generated markup changes so stale renders get redone.
+RENDER_REVISION = 1
+RENDER_VERSION = 'pygments-%s/%d' % (pygments.__version__, RENDER_REVISION)
+
+# Stamp of the stored renders which fell back to plain text, the code
+# couldn't be highlighted within the time budget at the time; they're
+# served, but redone later, see pastie.model.pasties.Paste.needs_render
+FALLBACK_VERSION = RENDER_VERSION + '/plain'
+
+# Stamp of the stored renders of code over the size budget, plain text too,
+# which are never redone
+OVERSIZE_VERSION = RENDER_VERSION + '/oversize'
+
+class HighlightFailed(Exception):
+    """The code couldn't be highlighted within the budgets, see
+    `pastie.lib.highlightpool.HighlightPool`"""
+
+class CodeTooLarge(HighlightFailed):
+    """The code is over the size budget, it's never highlighted"""
 
 
 
@@ -18,15 +44,49 @@ class PastieHtmlFormatter(HtmlFormatter):
         HtmlFormatter.__init__(self, **options)
         self.lineanchorlinks = options.get('lineanchorlinks', False)
 
-    def _wrap_tablelinenos(self, inner):
-        dummyoutfile = StringIO.StringIO()
-        lncount = 0
+    def iter_format(self, tokensource, lncount, linenostart=None):
+        """Like `format`, but yields the unencoded output as it's produced
+        instead of writing it all to a file. ``lncount`` is the number of
+        lines in ``tokensource``, which the line numbers need up front, and
+        ``linenostart`` overrides the formatter's first line number."""
+        return self.iter_wrap(self._format_lines(tokensource), lncount,
+                              linenostart)
+
+    def iter_wrap(self, source, lncount, linenostart=None):
+        """Like `iter_format`, for ``source``, a generator of the
+        ``(1, line)`` tuples of the lines already formatted"""
+        if self.hl_lines:
+            source = self._highlight_lines(source)
+        if not self.nowrap:
+            if self.linenos == 2:
+                source = self._wrap_inlinelinenos(source, lncount,
+                                                  linenostart)
+            if self.lineanchors:
+                source = self._wrap_lineanchors(source, linenostart)
+            source = self.wrap(source, None)
+            if self.linenos == 1:
+                source = self._wrap_tablelinenos(source, lncount,
+                                                 linenostart)
+        for t, piece in source:
+            yield piece
+
+    def _wrap_lineanchors(self, inner, linenostart=None):
+        s = self.lineanchors
+        i = (linenostart or self.linenostart) - 1
         for t, line in inner:
             if t:
-                lncount += 1
-            dummyoutfile.write(line)
+                i += 1
+                yield 1, '<a name="%s-%d"></a>' % (s, i) + line
+            else:
+                yield 0, line
 
-        fl = self.linenostart
+    def _wrap_tablelinenos(self, inner, lncount=None, linenostart=None):
+        if lncount is None:
+            # need all the lines to count them before anything is output
+            inner = list(inner)
+            lncount = len([t for t, line in inner if t])
+
+        fl = linenostart or self.linenostart
         mw = len(str(lncount + fl - 1))
         sp = self.linenospecial
         st = self.linenostep
@@ -56,16 +116,20 @@ class PastieHtmlFormatter(HtmlFormatter):
         yield 0, ('<table class="%stable">' % self.cssclass +
                   '<tr><td class="linenos"><pre>' +
                   ls + '</pre></td><td class="code">')
-        yield 0, dummyoutfile.getvalue()
+        for t, line in inner:
+            yield 0, line
         yield 0, '</td></tr></table>'
 
-    def _wrap_inlinelinenos(self, inner):
-        # need a list of lines since we need the width of a single number :(
-        lines = list(inner)
+    def _wrap_inlinelinenos(self, inner, lncount=None, linenostart=None):
+        lines = inner
+        if lncount is None:
+            # need a list of lines since we need the width of a single number
+            lines = list(inner)
+            lncount = len(lines)
         sp = self.linenospecial
         st = self.linenostep
-        num = self.linenostart
-        mw = len(str(len(lines) + num - 1))
+        num = linenostart or self.linenostart
+        mw = len(str(lncount + num - 1))
         s = self.lineanchors
 
         if sp:
@@ -92,44 +156,259 @@ class PastieHtmlFormatter(HtmlFormatter):
                     num += 1
 
 
+# Highlighted code is rendered, and cached, with this placeholder as the
+# line anchors prefix, and the paste's own anchors are only filled in
+# afterwards, so identical code pasted under different ids shares one
+# render. The placeholder is only replaced right after a double quote,
+# which can't come out of the escaped code itself.
+ANCHORS_PLACEHOLDER = 'pastie-anchors'
+
+# The formatter is shared by every render, possibly from several threads at
+# once; its configuration must never be changed after this point.
 formatter = PastieHtmlFormatter(linenos=True, cssclass="syntax",
-                                encoding='utf-8', lineanchors='line',
+                                encoding='utf-8',
+                                lineanchors=ANCHORS_PLACEHOLDER,
                                 lineanchorlinks=True, linenospecial=10)
 
+# Lexer instances by language name. Lexers keep no state while lexing so
+# the instances are shared between threads, and building them is far from
+# free, see benchmarks/bench_highlight.py
+lexers_cache = {}
+
+# Size, in characters, of the chunks streamed responses are sent in
+CHUNK_SIZE = 64*1024
+
+# Options the formatter output depends on, part of the cache keys
+FORMATTER_OPTIONS = ('linenos=%s cssclass=%s linenospecial=%s '
+                     'lineanchorlinks=%s') % (
+    formatter.linenos, formatter.cssclass, formatter.linenospecial,
+    formatter.lineanchorlinks)
+
+def get_lexer(language):
+    """Return the shared lexer instance for ``language``"""
+    language = language or 'text'
+    try:
+        return lexers_cache[language]
+    except KeyError:
+        # Two threads may both build it, no harm done, one of them wins
+        lexer = get_lexer_by_name(language, stripall=True)
+        lexers_cache[language] = lexer
+        return lexer
+
+def render_highlight(source, language):
+    """Highlight ``source`` using the lexer for ``language`` and return the
+    resulting HTML, with placeholder line anchors, as an unicode string"""
+    return highlight(source, get_lexer(language), formatter).decode('utf-8')
+
+def render_plain(source):
+    """Return ``source`` escaped inside a plain ``<pre>``, what's served when
+    a paste can't be highlighted within the configured budgets"""
+    return u'<div class="%s plain"><pre>%s</pre></div>' % (
+        formatter.cssclass, escape(source, True))
+
+def fill_anchors(html, paste_id):
+    """Replace the placeholder line anchors in ``html`` with the ones of
+    paste ``paste_id``"""
+    anchors = 'paste-%d-line-' % paste_id
+    return html.replace(u'"%s-' % ANCHORS_PLACEHOLDER, u'"' + anchors) \
+               .replace(u'"#%s-' % ANCHORS_PLACEHOLDER, u'"#' + anchors)
+
+def highlight_cache_key(source, language):
+    """The key highlighted code is cached under, a hash of everything the
+    output depends on"""
+    digest = hashlib.sha1(RENDER_VERSION)
+    digest.update('\0%s\0%s\0' % (FORMATTER_OPTIONS, language or 'text'))
+    digest.update(source.encode('utf-8'))
+    return digest.hexdigest()
+
+def highlight_source(source, language, fallback=True, g=None):
+    """Highlight ``source`` through the application's highlighting engine,
+    see `pastie.lib.highlightpool.HighlightPool`, and its highlight cache,
+    see `pastie.lib.store.LRUStore`. The line anchors are left to be filled
+    by `fill_anchors`.
+
+    Code which can't be highlighted within the budgets is returned as plain
+    text, and not cached, or, with ``fallback`` false, raises
+    `HighlightFailed`. ``g``, the application's globals, is needed outside
+    of the requests."""
+    if g is None:
+        g = config.get('pylons.g')
+    store = getattr(g, 'highlight_cache', None)
+    html = None
+    if store is not None:
+        key = highlight_cache_key(source, language)
+        html = store.get(key)
+    if html is not None:
+        return html.decode('utf-8')
+    engine = getattr(g, 'highlighter', None)
+    try:
+        if engine is None:
+            html = render_highlight(source, language)
+        else:
+            html = engine.render(source, language)
+    except HighlightFailed:
+        if not fallback:
+            raise
+        return render_plain(source)
+    if store is not None:
+        store.set(key, html.encode('utf-8'))
+    return html
+
+def render_code(source, language, paste_id):
+    """Highlight ``source`` for paste ``paste_id``, see `highlight_source`"""
+    return fill_anchors(highlight_source(source, language), paste_id)
+
+def prepare_source(lexer, source):
+    """Apply to ``source`` the same preprocessing ``lexer`` does before
+    lexing, which is needed to know its number of lines beforehand. Doing
+    it twice changes nothing."""
+    if source.startswith(u'\ufeff'):
+        source = source[1:]
+    source = source.replace('\r\n', '\n').replace('\r', '\n')
+    if lexer.stripall:
+        source = source.strip()
+    elif lexer.stripnl:
+        source = source.strip('\n')
+    if lexer.tabsize > 0:
+        source = source.expandtabs(lexer.tabsize)
+    if lexer.ensurenl and not source.endswith('\n'):
+        source += '\n'
+    return source
+
+def iter_split(text, chunk_size=CHUNK_SIZE):
+    """Generator of ``text`` ``chunk_size`` characters at a time"""
+    for start in xrange(0, len(text), chunk_size):
+        yield text[start:start+chunk_size]
+
+def iter_joined(pieces, chunk_size=CHUNK_SIZE):
+    """Generator of the ``pieces`` of text joined in chunks of at least
+    ``chunk_size`` characters, but the last one"""
+    chunk, size = [], 0
+    for piece in pieces:
+        chunk.append(piece)
+        size += len(piece)
+        if size >= chunk_size:
+            yield u''.join(chunk)
+            chunk, size = [], 0
+    if chunk:
+        yield u''.join(chunk)
+
+def iter_filled(chunks, paste_id):
+    """Generator of the ``chunks`` of HTML utf-8 encoded, with the line
+    anchors of paste ``paste_id`` filled in, see `fill_anchors`. The chunks
+    are cut after their last newline, so that no anchor is split."""
+    rest = u''
+    for chunk in chunks:
+        chunk = rest + chunk
+        cut = chunk.rfind(u'\n') + 1
+        rest = chunk[cut:]
+        if cut:
+            yield fill_anchors(chunk[:cut], paste_id).encode('utf-8')
+    if rest:
+        yield fill_anchors(rest, paste_id).encode('utf-8')
+
+def iter_highlight(source, language, deadline=None):
+    """Generator of the HTML of ``source`` highlighted as ``language``, with
+    placeholder line anchors, as the lexer goes. The lines left when time
+    ``deadline`` has passed are rendered as plain text."""
+    lexer = get_lexer(language)
+    text = prepare_source(lexer, source)
+
+    def lines():
+        count = 0
+        for line in formatter._format_lines(lexer.get_tokens(text)):
+            yield line
+            count += 1
+            if deadline is not None and time.time() > deadline:
+                break
+        else:
+            return
+        rest = text.split('\n', count)[-1]
+        start = 0
+        while start < len(rest):
+            stop = rest.find('\n', start) + 1 or len(rest)
+            yield 1, escape(rest[start:stop], True)
+            start = stop
+
+    return formatter.iter_wrap(lines(), text.count('\n'))
+
+def iter_highlight_source(source, language, g=None, chunk_size=CHUNK_SIZE):
+    """Like `highlight_source`, but a generator of chunks of the HTML,
+    about ``chunk_size`` characters each, sent on as they're produced.
+
+    The output can't come back from the engine's worker processes as it's
+    produced, the code is highlighted in the calling thread, within the
+    engine's budgets all the same: code over the size budget is sent as
+    plain text, and so are the lines left once the time budget is spent.
+    Renders found in the highlight cache are sent from it, the new ones
+    aren't cached, they would have to be kept whole."""
+    if g is None:
+        g = config.get('pylons.g')
+    store = getattr(g, 'highlight_cache', None)
+    if store is not None:
+        html = store.get(highlight_cache_key(source, language))
+        if html is not None:
+            for chunk in iter_split(html.decode('utf-8'), chunk_size):
+                yield chunk
+            return
+    engine = getattr(g, 'highlighter', None)
+    deadline = None
+    if engine is not None:
+        if engine.max_size and len(source) > engine.max_size:
+            for chunk in iter_split(render_plain(source), chunk_size):
+                yield chunk
+            return
+        if engine.timeout:
+            deadline = time.time() + engine.timeout
+    for chunk in iter_joined(iter_highlight(source, language, deadline),
+                             chunk_size):
+        yield chunk
+
+def stored_render(code):
+    """The render stored for paste ``code`` if it's one of this version,
+    highlighted or as plain text, ``None`` otherwise"""
+    rendered = code.rendered
+    if rendered is not None and rendered.version in \
+            (RENDER_VERSION, FALLBACK_VERSION, OVERSIZE_VERSION):
+        return rendered
+    return None
+
+def iter_code_highlight(code, chunk_size=CHUNK_SIZE):
+    """Like `code_highlight` but returns a generator of utf-8 encoded chunks
+    of HTML, about ``chunk_size`` characters each, so the page can be sent
+    while the code is highlighted, see `iter_highlight_source`. Stored
+    renders are read a chunk at a time, see
+    `pastie.model.pasties.iter_rendered_html`.
+
+    Everything needed is read from ``code`` before returning, the generator
+    is consumed after the database session is gone."""
+    if stored_render(code) is not None:
+        from pastie.model.pasties import iter_rendered_html
+        chunks = iter_rendered_html(code.body_hash, code.language, chunk_size)
+    else:
+        chunks = iter_highlight_source(code.code, code.language,
+                                       config.get('pylons.g'), chunk_size)
+    return iter_filled(chunks, code.id)
 
 def code_highlight(code, truncate_lines=None, diff_to=None):
+    if not truncate_lines and not diff_to:
+        rendered = stored_render(code)
+        if rendered is not None:
+            return XML(fill_anchors(rendered.html, code.id))
+
+    source = code.code
+    language = code.language
     if diff_to:
-        diff_to_id = diff_to.id
-    else:
-        diff_to_id = None
-
-    @beaker_cache(type='dbm', expire='never')
-    def cached_wrapper(paste_id=None, truncate_lines=None, diff_to_id=None):
-        source = code.code
-        if diff_to:
-            source = code.compare_to(diff_to)
-        if truncate_lines:
-            split_source = source.split('\n')
-            if len(split_source) > truncate_lines:
-                source = split_source[:truncate_lines-1]
-                source.append('...')
-                source = ''.join(source)
-
-        lexer = get_lexer_by_name(code.language or 'text', stripall=True)
-        if diff_to:
-            lexex = get_lexer_by_name('diff')
-
-        formatter.lineanchors='paste-%d-line' % paste_id
-        return highlight(source, lexer, formatter).decode('utf-8')
-    return XML(cached_wrapper(code.id, truncate_lines, diff_to_id))
-
-@beaker_cache(type='memory', expire=7200)
-def get_lexers(sorted_list=False):
-    lexers = {}
-    for name, aliases, _, _ in get_all_lexers():
-        if isinstance(aliases, (list, tuple)):
-            aliases = aliases[0]
-        lexers[aliases] = name
-    #lexers.sort(key=operator.itemgetter(0))
-    return lexers
+        source = code.compare_to(diff_to)
+        language = 'diff'
+    if truncate_lines:
+        split_source = source.split('\n')
+        if len(split_source) > truncate_lines:
+            source = split_source[:truncate_lines-1]
+            source.append('...')
+            source = '\n'.join(source)
+    return XML(render_code(source, language, code.id))
 
+def get_lexers(sorted_list=False):
+    """Return a dictionary of the languages' names by their aliases"""
+    return get_registry().names
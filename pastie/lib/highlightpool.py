@@ -0,0 +1,190 @@
+"""Out of process highlighting
+
+Lexing a big or pathological paste can keep a worker thread busy for
+seconds while holding the GIL against every other request. The
+`HighlightPool` runs the highlighting jobs in a bounded pool of worker
+processes instead, each job with a time budget, and refuses to highlight
+inputs over a size budget. Whenever a budget is exceeded `HighlightFailed`
+is raised, the paste is then served as plain escaped text, see
+`pastie.lib.highlight.highlight_source`.
+
+The time budget of a job starts when a worker picks it up, not while it
+waits for one. The worker interrupts the job itself when the budget is
+spent; one stuck where it can't be interrupted, in a regular expression's
+matching, is killed, on its own, and replaced by the pool. The other jobs
+carry on.
+"""
+import os
+import time
+import signal
+import logging
+import itertools
+import threading
+
+from pastie.lib.highlight import render_highlight, CodeTooLarge, \
+    HighlightFailed
+from pastie.lib.windowing import compute_checkpoints, render_window
+
+log = logging.getLogger(__name__)
+
+__all__ = ['HighlightPool']
+
+try:
+    import multiprocessing
+    from multiprocessing.queues import SimpleQueue
+    HAVE_MULTIPROCESSING = True
+except ImportError:
+    HAVE_MULTIPROCESSING = False
+
+# In the worker processes, where the jobs tell when they start
+_started = None
+
+def _init_worker(started):
+    global _started
+    _started = started
+    signal.signal(signal.SIGALRM, _over_budget)
+
+def _over_budget(signum, frame):
+    raise HighlightFailed('over the time budget')
+
+def _run_job(key, func, args, timeout):
+    """Run job ``key``, ``func(*args)``, in a worker process, interrupting
+    it after ``timeout`` seconds"""
+    _started.put((key, os.getpid(), time.time()))
+    signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        return func(*args)
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+
+class HighlightPool(object):
+    """Highlighting engine backed by a pool of worker processes
+
+    ``processes``
+        Number of worker processes, ``0`` highlights inline, in the calling
+        thread, in which case ``timeout`` can't be enforced.
+
+    ``timeout``
+        Seconds a single job is allowed to take once started.
+
+    ``max_size``
+        Size, in characters, above which the code isn't highlighted at all.
+    """
+
+    # Seconds between the checks, while waiting for a job, that it hasn't
+    # overrun its budget
+    poll_interval = 0.1
+
+    # Seconds past its budget after which a job which didn't stop when
+    # interrupted is killed along with its worker
+    kill_after = 1
+
+    def __init__(self, processes=0, timeout=10, max_size=512*1024):
+        if processes and not HAVE_MULTIPROCESSING:
+            log.warning("Highlighting inline, no multiprocessing package")
+            processes = 0
+        self.processes = processes
+        self.timeout = timeout
+        self.max_size = max_size
+        self.lock = threading.Lock()
+        self.pool = None
+        if self.processes:
+            self.jobs = itertools.count()
+            # (worker pid, start time) of the started jobs by key, see
+            # _started_job
+            self.started = {}
+            self.started_queue = SimpleQueue()
+            self.pool = multiprocessing.Pool(self.processes, _init_worker,
+                                             (self.started_queue,))
+
+    def render(self, source, language):
+        """Highlight ``source``, raising `CodeTooLarge` if it's bigger than
+        ``max_size``, or `HighlightFailed` if its highlighting takes more
+        than ``timeout`` seconds"""
+        if self.max_size and len(source) > self.max_size:
+            raise CodeTooLarge('%d characters of code are over the size '
+                                  'budget' % len(source))
+        return self._call(render_highlight, (source, language))
+
+    def checkpoints(self, source, language, every):
+        """Compute the lexer checkpoints of ``source``, see
+        `pastie.lib.windowing`. Code over the size budget is windowed as
+        plain text; raises `HighlightFailed` if it takes more than
+        ``timeout`` seconds."""
+        if self.max_size and len(source) > self.max_size:
+            return compute_checkpoints(source, 'text', every)
+        return self._call(compute_checkpoints, (source, language, every))
+
+    def window(self, source, language, paste_id, first, last,
+               checkpoints=None):
+        """Highlight lines ``first`` to ``last`` of ``source``, see
+        `pastie.lib.windowing.render_window`. Code over the size budget is
+        windowed as plain text; raises `HighlightFailed` if it takes more
+        than ``timeout`` seconds."""
+        if self.max_size and len(source) > self.max_size:
+            return render_window(source, language, paste_id, first, last,
+                                 checkpoints, plain=True)
+        return self._call(render_window, (source, language, paste_id, first,
+                                          last, checkpoints))
+
+    def _call(self, func, args):
+        """Run ``func(*args)`` in the pool, raising `HighlightFailed` if it
+        doesn't finish within the time budget once started"""
+        if not self.pool:
+            return func(*args)
+
+        key = self.jobs.next()
+        job = self.pool.apply_async(_run_job,
+                                    (key, func, args, self.timeout))
+        try:
+            while not job.ready():
+                started = self._started_job(key)
+                if started is not None:
+                    pid, start = started
+                    if time.time() > start + self.timeout + self.kill_after:
+                        self._kill(pid, func, args)
+                job.wait(self.poll_interval)
+        finally:
+            self._started_job(key, forget=True)
+        try:
+            return job.get()
+        except HighlightFailed:
+            log.warning('%s on %d characters of %s code took over %s '
+                        'seconds', func.__name__, len(args[0]), args[1],
+                        self.timeout)
+            raise
+
+    def _started_job(self, key, forget=False):
+        """The ``(pid, start time)`` of job ``key`` if a worker has started
+        it, ``None`` otherwise. With ``forget`` true, it's no longer kept;
+        a job's start is queued before its result, it's known by then."""
+        self.lock.acquire()
+        try:
+            # Only one thread reads the queue at a time
+            while not self.started_queue.empty():
+                started_key, pid, start = self.started_queue.get()
+                self.started[started_key] = pid, start
+            if forget:
+                return self.started.pop(key, None)
+            return self.started.get(key)
+        finally:
+            self.lock.release()
+
+    def _kill(self, pid, func, args):
+        """Kill worker ``pid``, stuck in a job which didn't stop when its
+        budget was spent; the pool replaces it, the job is lost"""
+        log.warning('Killing highlighting worker %d, stuck in %s on %d '
+                    'characters of %s code', pid, func.__name__,
+                    len(args[0]), args[1])
+        try:
+            os.kill(pid, signal.SIGKILL)
+        except OSError:
+            # Gone already
+            pass
+        raise HighlightFailed('%s took over %s seconds' %
+                              (func.__name__, self.timeout))
+
+    def close(self):
+        if self.pool:
+            self.pool.terminate()
+            self.pool = None
@@ -51,6 +51,9 @@ import webhelpers
 from routes import Mapper
 
 import re
+import time
+import datetime
+import threading
 
 # Deprecation warnings
 import warnings
@@ -115,8 +118,18 @@ class _SQLAlchemyTable(object):
         return self.sqlalchemy_engine.execute(select).fetchall()
 
     def __len__(self):
-        select = sqlalchemy.select([self.obj])
-        return self.sqlalchemy_engine.execute(select).rowcount
+        select = sqlalchemy.select([sqlalchemy.func.count()],
+                                   from_obj=[self.obj])
+        return self.sqlalchemy_engine.execute(select).scalar()
+
+    def count_upto(self, limit):
+        rows = sqlalchemy.select([sqlalchemy.literal_column('1')],
+                                 from_obj=[self.obj]).limit(limit).alias()
+        select = sqlalchemy.select([sqlalchemy.func.count()], from_obj=[rows])
+        return self.sqlalchemy_engine.execute(select).scalar()
+
+    def count_key(self):
+        return str(self.obj)
 
 class _SQLAlchemyQuery(object):
     """
@@ -133,6 +146,93 @@ class _SQLAlchemyQuery(object):
     def __len__(self):
         return self.obj.count()
 
+    def count_upto(self, limit):
+        # Counts the primary keys of the first rows in a subquery
+        return self.obj.limit(limit).count()
+
+    def count_key(self):
+        statement = self.obj.statement.compile()
+        return (str(statement), tuple(sorted(statement.params.items())))
+
+def _count_upto(collection, limit):
+    """
+    Number of items in collection, counting no further than limit
+    """
+    if hasattr(collection, 'count_upto'):
+        return collection.count_upto(limit)
+    return min(len(collection), limit)
+
+class ExactCount(object):
+    """
+    Count strategy counting all the items, every time
+
+    A count strategy is called with the collection, wrapped as get_wrapper()
+    does, and returns (item_count, capped), capped telling that there are
+    more items than item_count.
+    """
+    def __call__(self, collection):
+        return len(collection), False
+
+class CappedCount(object):
+    """
+    Count strategy counting up to limit items, there are "more than limit"
+    otherwise. The database stops reading rows past the limit.
+    """
+    def __init__(self, limit=10000):
+        self.limit = limit
+
+    def __call__(self, collection):
+        count = _count_upto(collection, self.limit + 1)
+        if count > self.limit:
+            return self.limit, True
+        return count, False
+
+class CachedCount(object):
+    """
+    Count strategy remembering the counts of another strategy for ttl
+    seconds, by query. The counts are kept in the process.
+    """
+    def __init__(self, ttl=60, strategy=None):
+        self.ttl = ttl
+        self.strategy = strategy or ExactCount()
+        self.counts = {}
+        self.lock = threading.Lock()
+
+    def __call__(self, collection):
+        if not hasattr(collection, 'count_key'):
+            return self.strategy(collection)
+        key = collection.count_key()
+        now = time.time()
+        cached = self.counts.get(key)
+        if cached is not None and now - cached[0] < self.ttl:
+            return cached[1]
+        result = self.strategy(collection)
+        self.lock.acquire()
+        try:
+            for old in [k for k, v in self.counts.items()
+                        if now - v[0] >= self.ttl]:
+                del self.counts[old]
+            self.counts[key] = (now, result)
+        finally:
+            self.lock.release()
+        return result
+
+class CounterCount(object):
+    """
+    Count strategy reading a counter maintained as items are added and
+    removed, read() returning its value, or None when there is no such
+    counter, the fallback strategy counts then.
+    """
+    def __init__(self, read, fallback=None):
+        self.read = read
+        self.fallback = fallback or ExactCount()
+
+    def __call__(self, collection):
+        count = self.read()
+        if count is None:
+            return self.fallback(collection)
+        return count, False
+
 
 # Since the items on a page are mainly a list we subclass the "list" type
 class Page(list):
@@ -166,6 +266,9 @@ class Page(list):
     item_count
         Number of items in the collection
 
+    item_count_capped
+        Whether there are more items than item_count, see CappedCount
+
     current_page
         Number of the current page
 
@@ -191,7 +294,7 @@ class Page(list):
         Index of last item on the current page
     """
     def __init__(self, collection, current_page=1, items_per_page=20,
-        item_count=None, sqlalchemy_engine=None, *args, **kwargs):
+        item_count=None, sqlalchemy_engine=None, count=None, *args, **kwargs):
         """
         Create a "Page" instance.
 
@@ -219,6 +322,11 @@ class Page(list):
             then you need to provide an 'engine' object here. A 'Table'
             object does not have a database connection attached so the paginator
             wouldn't be able to execute a SELECT query without it.
+
+        count (optional)
+            The strategy counting the items when item_count isn't given:
+            ExactCount (the default), CappedCount, CachedCount or
+            CounterCount.
         """
         # 'page_nr' is deprecated. 'current_page' is clearer and used by Ruby-on-Rails, too
         if 'page_nr' in kwargs:
@@ -247,10 +355,12 @@ class Page(list):
 
         # Unless the user tells us how many items the collections has
         # we calculate that ourselves.
+        self.item_count_capped = False
         if item_count:
             self.item_count = item_count
         else:
-            self.item_count = len(self.collection)
+            self.item_count, self.item_count_capped = \
+                    (count or ExactCount())(self.collection)
 
         # Compute the number of the first and last available page
         if self.item_count > 0:
@@ -732,6 +842,197 @@ class Page(list):
             nav_items.append(_link(self.last_page+(start_with_one and 1)-1, text))
         return seperator.join(nav_items)
 
+class KeysetPage(list):
+    """
+    A page of an SQLAlchemy query, found by seeking from a cursor
+
+    "Page" skips the items of the previous pages with OFFSET, which the
+    database still has to read, so the deeper the page the slower it gets,
+    and items move from a page to the next as new ones are added. A
+    "KeysetPage" instead starts right after (or before) an item, given by a
+    cursor made of the values of the ordering columns of that item. The
+    query is sorted on these columns, the last one being unique, so with an
+    index over them every page costs the same and its content doesn't move.
+
+    The pages go from the highest keys, the newest items when paging by
+    date, down:
+
+    - The first page has the highest keys.
+    - The "older" cursor of a page gives the page after it, with lower keys.
+    - The "newer" cursor of a page gives the page before it.
+
+    Instance attributes:
+
+    items
+        Sequence of items on the current page
+
+    items_per_page
+        Maximal number of items per page
+
+    has_older, has_newer
+        Whether there are items after, or before, the current page
+
+    item_count, item_count_capped
+        Number of items in the query, and whether there are more, when
+        a count strategy is given, see Page; None otherwise
+
+    older, newer
+        Cursors of the pages after and before the current page, or None
+        if there is no such page
+    """
+    def __init__(self, query, columns, cursor=None, direction='older',
+        items_per_page=20, count=None):
+        """
+        Create a "KeysetPage" instance.
+
+        Parameters:
+
+        query
+            SQLAlchemy query of the items to page through.
+
+        columns
+            Columns to sort the items on, the items must have attributes
+            named after them. The last one must be unique, e.g. the primary
+            key.
+
+        cursor (optional)
+            The "older" or "newer" cursor of another page. Without it, or
+            if it's not valid, the first page is returned.
+
+        direction
+            'older' to get the page after the one cursor comes from,
+            'newer' for the one before it.
+
+        items_per_page
+            The maximal number of items to be displayed per page.
+            Default: 20.
+
+        count (optional)
+            The strategy counting the items, see Page. Without it the
+            items aren't counted.
+        """
+        self.query = query
+        self.columns = columns
+        self.items_per_page = items_per_page
+
+        values = None
+        if cursor and direction in ('older', 'newer'):
+            try:
+                values = self.decode_cursor(cursor)
+            except ValueError:
+                values = None
+        newer = values is not None and direction == 'newer'
+        items = self._seek(values, newer)
+        more = len(items) > items_per_page
+        items = items[:items_per_page]
+        if newer:
+            items.reverse()
+            if not more:
+                # Back to the top, show a full first page
+                values = None
+                items = self._seek(None, False)
+                more = len(items) > items_per_page
+                items = items[:items_per_page]
+
+        if values is None:
+            self.has_newer = False
+            self.has_older = more
+        elif newer:
+            self.has_newer = more
+            self.has_older = True
+        else:
+            self.has_newer = True
+            self.has_older = more
+
+        self.item_count = self.item_count_capped = None
+        if count is not None:
+            self.item_count, self.item_count_capped = \
+                    count(get_wrapper(query))
+
+        self.items = items
+        self.newer = self.has_newer and items and \
+                self.encode_cursor(items[0]) or None
+        self.older = self.has_older and items and \
+                self.encode_cursor(items[-1]) or None
+
+        list.__init__(self, self.items)
+
+    def _seek(self, values, newer):
+        """
+        Return up to items_per_page + 1 items, the one more telling whether
+        there are more, with keys lower than values, or higher if newer
+        """
+        query = self.query
+        if values is not None:
+            query = query.filter(_seek_clause(self.columns, values, newer))
+        if newer:
+            order = [column.asc() for column in self.columns]
+        else:
+            order = [column.desc() for column in self.columns]
+        return query.order_by(order).limit(self.items_per_page + 1).all()
+
+    def encode_cursor(self, item):
+        """
+        Return the cursor of item, its values of the columns joined by '_'
+        """
+        values = []
+        for column in self.columns:
+            value = getattr(item, column.key)
+            if isinstance(value, datetime.datetime):
+                value = value.strftime(CURSOR_DATE_FORMAT)
+            values.append(str(value))
+        return '_'.join(values)
+
+    def decode_cursor(self, cursor):
+        """
+        Return the column values of cursor, raise ValueError if it's not
+        valid
+        """
+        values = cursor.split('_')
+        if len(values) != len(self.columns):
+            raise ValueError('Invalid cursor %r' % cursor)
+        decoded = []
+        for column, value in zip(self.columns, values):
+            if isinstance(column.type, sqlalchemy.types.DateTime):
+                value = datetime.datetime.strptime(value, CURSOR_DATE_FORMAT)
+            elif isinstance(column.type, sqlalchemy.types.Integer):
+                value = int(value)
+            decoded.append(value)
+        return decoded
+
+    def __repr__(self):
+        return ("KeysetPage:\n"
+            "Items per page:   %(items_per_page)s\n"
+            "Newer cursor:     %(newer)s\n"
+            "Older cursor:     %(older)s\n"
+            % {
+            'items_per_page':self.items_per_page,
+            'newer':self.newer,
+            'older':self.older,
+            })
+
+# Cursors keep the microseconds, so that items created in the same second
+# are told apart
+CURSOR_DATE_FORMAT = '%Y%m%dT%H%M%S.%f'
+
+def _seek_clause(columns, values, newer):
+    """
+    Return the condition selecting the rows whose columns come after values,
+    in descending order, or before them if newer. The first column is
+    also bounded on its own so that an index on it can be used.
+    """
+    column, value = columns[0], values[0]
+    if len(columns) == 1:
+        if newer:
+            return column > value
+        return column < value
+    rest = _seek_clause(columns[1:], values[1:], newer)
+    if newer:
+        return sqlalchemy.and_(column >= value,
+                               sqlalchemy.or_(column > value, rest))
+    return sqlalchemy.and_(column <= value,
+                           sqlalchemy.or_(column < value, rest))
+
 # Unit tests (useing Nose 0.9.3)
 def testEmptyList():
     """
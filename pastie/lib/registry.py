@@ -0,0 +1,99 @@
+"""Registry of the available lexers
+
+Walking ``get_all_lexers()`` imports every Pygments lexer module; it used to
+be done at import time by several modules, each keeping its own copy of
+the result. The registry is instead read from `pastie.lib.lexerdata`, a
+snapshot generated for a Pygments version, the first time it's needed,
+and shared by everything listing languages. When the installed Pygments
+doesn't match the snapshot the registry is built from Pygments itself.
+
+Regenerate the snapshot after upgrading Pygments with::
+
+    python -m pastie.lib.registry
+"""
+import os.path
+import logging
+import pprint
+
+import pygments
+from pygments.lexers import get_all_lexers
+
+log = logging.getLogger(__name__)
+
+__all__ = ['get_registry', 'LanguageList']
+
+class LexerRegistry(object):
+    """Names, aliases, filename patterns and mimetypes of the lexers
+
+    ``lexers``
+        Sequence of ``(name, aliases, filenames, mimetypes)`` tuples, as
+        returned by ``get_all_lexers()``.
+    """
+
+    def __init__(self, version, lexers):
+        self.version = version
+        self.lexers = lexers
+        # Lexers are known by their first alias
+        self.names = dict((aliases[0], name) for name, aliases, _, _ in lexers)
+        self.languages = frozenset(self.names)
+        # The first mimetype of the lexers listing any, by alias
+        self.mimetypes = {}
+        for name, aliases, _, mimetypes in lexers:
+            if mimetypes:
+                for alias in aliases:
+                    self.mimetypes.setdefault(alias, mimetypes[0])
+
+    def mimetype(self, language):
+        """The mimetype the code in ``language`` is downloaded as,
+        ``text/plain`` for the lexers without one"""
+        return self.mimetypes.get(language or 'text', 'text/plain')
+
+_registry = None
+
+def get_registry():
+    """Return the lexer registry, loading it on first use"""
+    global _registry
+    if _registry is None:
+        from pastie.lib import lexerdata
+        if lexerdata.VERSION == pygments.__version__:
+            _registry = LexerRegistry(lexerdata.VERSION, lexerdata.LEXERS)
+        else:
+            log.warning('Lexers snapshot is for Pygments %s, not %s, run '
+                        '"python -m pastie.lib.registry" to regenerate it',
+                        lexerdata.VERSION, pygments.__version__)
+            _registry = LexerRegistry(pygments.__version__,
+                                      tuple(get_all_lexers()))
+    return _registry
+
+class LanguageList(object):
+    """Sequence of the known languages, for validators, which doesn't load
+    the registry until it's used"""
+
+    def __contains__(self, language):
+        return language in get_registry().languages
+
+    def __iter__(self):
+        return iter(sorted(get_registry().languages))
+
+    def __len__(self):
+        return len(get_registry().languages)
+
+def generate(filename=None):
+    """Write the lexers snapshot for the installed Pygments"""
+    if filename is None:
+        filename = os.path.join(os.path.dirname(__file__), 'lexerdata.py')
+    lexers = sorted(tuple(get_all_lexers()))
+    out = open(filename, 'w')
+    try:
+        out.write('"""Snapshot of the Pygments lexers, see '
+                  'pastie.lib.registry\n\n'
+                  'Generated by "python -m pastie.lib.registry", don\'t edit.'
+                  '\n"""\n\n')
+        out.write('VERSION = %r\n\n' % pygments.__version__)
+        out.write('LEXERS = %s\n' % pprint.pformat(tuple(lexers)))
+    finally:
+        out.close()
+    return filename
+
+if __name__ == '__main__':
+    print 'Wrote %s' % generate()
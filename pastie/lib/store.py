@@ -0,0 +1,248 @@
+"""Size bounded key/value store shared by all processes on a host
+
+`LRUStore` keeps its entries in a sqlite database file, so every worker
+process on the host sees the same entries, and evicts the least recently
+used ones whenever the total size of the stored values goes over a byte
+budget. Hit, miss and eviction counters are kept in the same database.
+
+Reads don't write, so that they don't take the database's write lock: the
+eviction order only needs to be roughly right, the entries read have their
+access time updated at most once every ``touch_interval`` seconds, and the
+hits and misses are counted by each process and added to the database's
+counters along with its writes, or every ``flush_interval`` seconds.
+"""
+import os
+import time
+import logging
+import threading
+import sqlite3
+
+log = logging.getLogger(__name__)
+
+__all__ = ['LRUStore']
+
+class LRUStore(object):
+    """Least recently used key/value store backed by sqlite
+
+    ``filename``
+        Path of the sqlite database, created if missing.
+
+    ``max_bytes``
+        Budget for the total size of the stored values.
+
+    ``table``
+        Name of the table holding the entries; several stores can share the
+        same database file using different tables.
+
+    ``touch_interval``
+        Seconds between the updates of the access time of an entry read.
+
+    ``flush_interval``
+        Seconds between the additions of the hits and misses counted by the
+        process to the database's counters, when it doesn't write.
+
+    Keys are strings, values are byte strings.
+    """
+
+    def __init__(self, filename, max_bytes, table='entries',
+                 touch_interval=60, flush_interval=60):
+        self.filename = filename
+        self.max_bytes = max_bytes
+        self.table = table
+        self.touch_interval = touch_interval
+        self.flush_interval = flush_interval
+        self.local = threading.local()
+        self.lock = threading.Lock()
+        # Hits and misses not added to the database's counters yet
+        self.counts = dict(hits=0, misses=0)
+        self.counts_pid = os.getpid()
+        self.flushed = time.time()
+        dirname = os.path.dirname(filename)
+        if dirname and not os.path.isdir(dirname):
+            os.makedirs(dirname)
+        self._execute_script("""
+            CREATE TABLE IF NOT EXISTS %(table)s (
+                key TEXT PRIMARY KEY,
+                value BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                atime REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS %(table)s_atime ON %(table)s (atime);
+            CREATE TABLE IF NOT EXISTS %(table)s_stats (
+                name TEXT PRIMARY KEY,
+                value INTEGER NOT NULL
+            );
+            INSERT OR IGNORE INTO %(table)s_stats VALUES ('bytes', 0);
+            INSERT OR IGNORE INTO %(table)s_stats VALUES ('hits', 0);
+            INSERT OR IGNORE INTO %(table)s_stats VALUES ('misses', 0);
+            INSERT OR IGNORE INTO %(table)s_stats VALUES ('evictions', 0);
+        """ % dict(table=self.table))
+
+    @property
+    def connection(self):
+        """sqlite connections can't be shared between threads, nor between
+        processes after a fork, keep one per thread and process"""
+        pid = os.getpid()
+        if getattr(self.local, 'pid', None) != pid:
+            conn = sqlite3.connect(self.filename, timeout=30,
+                                   isolation_level=None)
+            conn.text_factory = str
+            try:
+                conn.execute('PRAGMA journal_mode=WAL')
+            except sqlite3.DatabaseError:
+                # Older sqlite, readers will block on writers
+                pass
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self.local.connection = conn
+            self.local.pid = pid
+        return self.local.connection
+
+    def _execute_script(self, script):
+        self.connection.executescript(script)
+
+    def _bump(self, conn, name, amount=1):
+        conn.execute('UPDATE %s_stats SET value = value + ? WHERE name = ?' %
+                     self.table, (amount, name))
+
+    def _count(self, name):
+        self.lock.acquire()
+        try:
+            if self.counts_pid != os.getpid():
+                # Inherited from the parent process, which counted them
+                self.counts = dict(hits=0, misses=0)
+                self.counts_pid = os.getpid()
+            self.counts[name] += 1
+        finally:
+            self.lock.release()
+
+    def _flush_counts(self, conn):
+        """Add the hits and misses counted by the process to the database's
+        counters, within the current transaction"""
+        self.lock.acquire()
+        try:
+            counts = self.counts
+            if self.counts_pid != os.getpid():
+                counts = {}
+                self.counts_pid = os.getpid()
+            self.counts = dict(hits=0, misses=0)
+            self.flushed = time.time()
+        finally:
+            self.lock.release()
+        for name, amount in counts.items():
+            if amount:
+                self._bump(conn, name, amount)
+
+    def _flush(self):
+        """Add the hits and misses counted by the process to the database's
+        counters"""
+        conn = self.connection
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            self._flush_counts(conn)
+            conn.execute('COMMIT')
+        except:
+            conn.execute('ROLLBACK')
+            raise
+
+    def get(self, key, default=None):
+        """Return the value stored for ``key``, or ``default``"""
+        conn = self.connection
+        row = conn.execute('SELECT value, atime FROM %s WHERE key = ?' %
+                           self.table, (key,)).fetchone()
+        now = time.time()
+        if row is None:
+            self._count('misses')
+        else:
+            self._count('hits')
+            if now - row[1] > self.touch_interval:
+                conn.execute('UPDATE %s SET atime = ? WHERE key = ?' %
+                             self.table, (now, key))
+        if now - self.flushed > self.flush_interval:
+            self._flush()
+        if row is None:
+            return default
+        return str(row[0])
+
+    def set(self, key, value):
+        """Store ``value`` under ``key``, evicting the least recently used
+        entries if needed to stay within the byte budget"""
+        size = len(value)
+        if size > self.max_bytes:
+            log.debug('Not storing %r, %d bytes is over the %d bytes budget',
+                      key, size, self.max_bytes)
+            return
+        conn = self.connection
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            row = conn.execute('SELECT size FROM %s WHERE key = ?' %
+                               self.table, (key,)).fetchone()
+            conn.execute('INSERT OR REPLACE INTO %s VALUES (?, ?, ?, ?)' %
+                         self.table, (key, sqlite3.Binary(value), size,
+                                      time.time()))
+            self._bump(conn, 'bytes', size - (row and row[0] or 0))
+            self._evict(conn)
+            self._flush_counts(conn)
+            conn.execute('COMMIT')
+        except:
+            conn.execute('ROLLBACK')
+            raise
+
+    def _evict(self, conn):
+        total = conn.execute("SELECT value FROM %s_stats WHERE name = 'bytes'"
+                             % self.table).fetchone()[0]
+        evicted = freed = 0
+        while total - freed > self.max_bytes:
+            rows = conn.execute('SELECT key, size FROM %s ORDER BY atime '
+                                'LIMIT 32' % self.table).fetchall()
+            if not rows:
+                break
+            for key, size in rows:
+                conn.execute('DELETE FROM %s WHERE key = ?' % self.table,
+                             (key,))
+                evicted += 1
+                freed += size
+                if total - freed <= self.max_bytes:
+                    break
+        if evicted:
+            log.debug('Evicted %d entries, %d bytes, from %s', evicted, freed,
+                      self.table)
+            self._bump(conn, 'bytes', -freed)
+            self._bump(conn, 'evictions', evicted)
+
+    def remove(self, key):
+        """Remove ``key`` from the store, if present"""
+        conn = self.connection
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            row = conn.execute('SELECT size FROM %s WHERE key = ?' %
+                               self.table, (key,)).fetchone()
+            if row is not None:
+                conn.execute('DELETE FROM %s WHERE key = ?' % self.table,
+                             (key,))
+                self._bump(conn, 'bytes', -row[0])
+            self._flush_counts(conn)
+            conn.execute('COMMIT')
+        except:
+            conn.execute('ROLLBACK')
+            raise
+
+    def clear(self):
+        """Remove every entry from the store"""
+        self._execute_script("""
+            BEGIN IMMEDIATE;
+            DELETE FROM %(table)s;
+            UPDATE %(table)s_stats SET value = 0 WHERE name = 'bytes';
+            COMMIT;
+        """ % dict(table=self.table))
+
+    def stats(self):
+        """Return a dictionary with the ``hits``, ``misses``, ``evictions``,
+        ``bytes`` and ``entries`` counts of the store, including the hits
+        and misses counted by this process"""
+        conn = self.connection
+        self._flush()
+        stats = dict(conn.execute('SELECT name, value FROM %s_stats' %
+                                  self.table).fetchall())
+        stats['entries'] = conn.execute('SELECT COUNT(*) FROM %s' %
+                                        self.table).fetchone()[0]
+        return stats
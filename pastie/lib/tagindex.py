@@ -0,0 +1,93 @@
+"""Tag suggestions for the new paste form
+
+The tags table holds tens of thousands of names; rather than sending them
+all with the form, the form asks for the tags starting with what's being
+typed. `TagIndex` keeps the names sorted in memory, so the tags with a
+prefix are found by bisection, and ranks them by their number of pastes.
+
+The index is loaded from the tags table on first use. The tags of the
+pastes created by this process are added to it as they're created, the
+ones created by the other processes are picked up by reloading it when it
+gets older than ``tags.index_ttl`` seconds.
+"""
+import time
+import logging
+import threading
+from bisect import bisect_left, insort
+from heapq import nsmallest
+
+from pylons import config
+from sqlalchemy import select
+
+from pastie.model import Session
+from pastie.model.common import tag_table
+
+log = logging.getLogger(__name__)
+
+__all__ = ['get_tag_index', 'TagIndex']
+
+class TagIndex(object):
+    """Sorted, in memory, index of the tag names and their paste counts
+
+    ``ttl``
+        Seconds after which the index is reloaded from the database, 0 to
+        never reload it.
+    """
+
+    def __init__(self, ttl=300):
+        self.ttl = ttl
+        self.names = []     # sorted tag names
+        self.counts = {}    # tag name -> number of pastes
+        self.loaded = None
+        self.lock = threading.Lock()
+
+    def load(self):
+        """(Re)load the index from the tags table"""
+        rows = Session.execute(select([tag_table.c.name,
+                                       tag_table.c.paste_count]))
+        counts = dict((row[0], row[1]) for row in rows)
+        self.lock.acquire()
+        try:
+            self.counts = counts
+            self.names = sorted(counts)
+            self.loaded = time.time()
+        finally:
+            self.lock.release()
+        log.debug('Loaded %d tags', len(counts))
+
+    def add(self, names):
+        """Count one more paste for each of the tags ``names``, adding the
+        new ones to the index"""
+        if self.loaded is None:
+            return
+        self.lock.acquire()
+        try:
+            for name in names:
+                if name not in self.counts:
+                    insort(self.names, name)
+                    self.counts[name] = 0
+                self.counts[name] += 1
+        finally:
+            self.lock.release()
+
+    def suggest(self, prefix, limit=10):
+        """The names, up to ``limit`` of them, of the tags in use starting
+        with ``prefix``, the most used first"""
+        if self.loaded is None or \
+                (self.ttl and time.time() - self.loaded > self.ttl):
+            self.load()
+        names, counts = self.names, self.counts
+        start = bisect_left(names, prefix)
+        end = bisect_left(names, prefix + u'\uffff', start)
+        return nsmallest(limit, (name for name in names[start:end]
+                                 if counts.get(name, 0) > 0),
+                         key=lambda name: (-counts[name], name))
+
+_index = None
+
+def get_tag_index():
+    """Return the tag index of this process, creating it on first use"""
+    global _index
+    if _index is None:
+        _index = TagIndex(int(config.get('tags.index_ttl', 300)))
+    return _index
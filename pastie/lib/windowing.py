@@ -0,0 +1,233 @@
+"""Line range (windowed) rendering of big pastes
+
+Only the lines of the requested window are highlighted. To avoid lexing a
+paste from its top to reach a window deep into it, the state of the lexer
+is recorded every so many lines when the paste is rendered, see
+`compute_checkpoints`, and the lexing of a window is resumed from the
+closest checkpoint before it.
+
+A checkpoint is a ``(line, pos, stack)`` tuple: ``pos`` is the offset in the
+(preprocessed) code where the lexer can be resumed, ``line`` is the line
+that offset falls in and ``stack`` is the lexer state stack at that point,
+or ``None`` for lexers that have no state.
+"""
+from pylons import config
+from pygments.lexer import RegexLexer
+from pygments.lexers.special import TextLexer
+from pygments.token import Error, Text, _TokenType
+
+from pastie.lib.highlight import fill_anchors, formatter, get_lexer, \
+    prepare_source, HighlightFailed, RENDER_VERSION
+
+__all__ = ['code_window', 'compute_checkpoints', 'parse_window',
+           'render_checkpoints']
+
+# Lexers whose output doesn't depend on any state, they can be started on
+# any line
+STATELESS_LEXERS = (TextLexer,)
+
+def parse_window(lines):
+    """Parse a ``first-last`` lines range, returning ``(first, last)`` or
+    ``None`` if it's not a valid range"""
+    try:
+        first, last = [int(n) for n in lines.split('-', 1)]
+    except (AttributeError, ValueError):
+        return None
+    if first < 1 or last < first:
+        return None
+    return first, last
+
+def _resumable(lexer):
+    """Whether ``lexer`` is lexed by `RegexLexer`'s own loop, which
+    `_lex_with_states` reproduces"""
+    if not isinstance(lexer, RegexLexer):
+        return False
+    method = type(lexer).get_tokens_unprocessed
+    return method.im_func is RegexLexer.get_tokens_unprocessed.im_func
+
+def _lex_with_states(lexer, text, pos=0, stack=('root',)):
+    """`RegexLexer.get_tokens_unprocessed`, which also yields a
+    ``(pos, None, statestack)`` tuple before each match, a point where the
+    lexing can be resumed from with that state stack"""
+    tokendefs = lexer._tokens
+    statestack = list(stack)
+    statetokens = tokendefs[statestack[-1]]
+    while 1:
+        yield pos, None, statestack
+        for rexmatch, action, new_state in statetokens:
+            m = rexmatch(text, pos)
+            if m:
+                if action is not None:
+                    if type(action) is _TokenType:
+                        yield pos, action, m.group()
+                    else:
+                        for item in action(lexer, m):
+                            yield item
+                pos = m.end()
+                if new_state is not None:
+                    # state transition
+                    if isinstance(new_state, tuple):
+                        for state in new_state:
+                            if state == '#pop':
+                                if len(statestack) > 1:
+                                    statestack.pop()
+                            elif state == '#push':
+                                statestack.append(statestack[-1])
+                            else:
+                                statestack.append(state)
+                    elif isinstance(new_state, int):
+                        # pop, but keep at least one state on the stack
+                        if abs(new_state) >= len(statestack):
+                            del statestack[1:]
+                        else:
+                            del statestack[new_state:]
+                    elif new_state == '#push':
+                        statestack.append(statestack[-1])
+                    else:
+                        assert False, "wrong state def: %r" % new_state
+                    statetokens = tokendefs[statestack[-1]]
+                break
+        else:
+            try:
+                if text[pos] == '\n':
+                    # at EOL, reset state to "root"
+                    statestack = ['root']
+                    statetokens = tokendefs['root']
+                    yield pos, Text, u'\n'
+                    pos += 1
+                    continue
+                yield pos, Error, text[pos]
+                pos += 1
+            except IndexError:
+                break
+
+def _line_offset(text, pos, count):
+    """Offset of the line ``count`` lines after the one starting at ``pos``"""
+    for i in xrange(count):
+        pos = text.find('\n', pos) + 1
+        if not pos:
+            return len(text)
+    return pos
+
+def compute_checkpoints(source, language, every):
+    """Return the checkpoints, one every ``every`` lines, of the lexing of
+    ``source`` as ``language``. Empty if the lexer can't be resumed."""
+    lexer = get_lexer(language)
+    text = prepare_source(lexer, source)
+    checkpoints = []
+    if isinstance(lexer, STATELESS_LEXERS):
+        line, pos = 1, 0
+        while True:
+            pos = _line_offset(text, pos, every)
+            if pos >= len(text):
+                break
+            line += every
+            checkpoints.append((line, pos, None))
+    elif _resumable(lexer):
+        line, last_pos, next_line = 1, 0, 1 + every
+        for pos, ttype, value in _lex_with_states(lexer, text):
+            if ttype is not None:
+                continue
+            line += text.count('\n', last_pos, pos)
+            last_pos = pos
+            if line >= next_line:
+                checkpoints.append((line, pos, tuple(value)))
+                next_line = line + every
+    return checkpoints
+
+def _window_tokens(tokens, line, first, last):
+    """Keep, out of ``tokens`` starting on line ``line``, only the ones
+    covering lines ``first`` to ``last``, splitting the ones across the
+    window's edges"""
+    for ttype, value in tokens:
+        if line > last:
+            return
+        newlines = value.count('\n')
+        if line + newlines < first:
+            line += newlines
+            continue
+        if line < first:
+            value = value.split('\n', first - line)[-1]
+            line = first
+            newlines = value.count('\n')
+        if line + newlines > last:
+            value = '\n'.join(value.split('\n')[:last - line + 1]) + '\n'
+            if value:
+                yield ttype, value
+            return
+        if value:
+            yield ttype, value
+        line += newlines
+
+def render_window(source, language, paste_id, first, last, checkpoints=None,
+                  plain=False):
+    """Highlight lines ``first`` to ``last`` of ``source``, resuming from
+    the closest of ``checkpoints``, or, with ``plain`` true, render them as
+    plain text.
+
+    Returns ``(html, first, last, lines)``, the window clamped to the
+    ``lines`` the code has."""
+    lexer = get_lexer(plain and 'text' or language)
+    text = prepare_source(lexer, source)
+    lines = text.count('\n')
+    first = max(1, min(first, lines))
+    last = max(first, min(last, lines))
+
+    start = (1, 0, ('root',))
+    for checkpoint in checkpoints or ():
+        if checkpoint[0] >= first:
+            break
+        start = checkpoint
+
+    if isinstance(lexer, STATELESS_LEXERS):
+        line, pos = start[:2]
+        if start[2] is not None:
+            # the checkpoints of another lexer
+            line, pos = 1, 0
+        pos = _line_offset(text, pos, first - line)
+        end = _line_offset(text, pos, last - first + 1)
+        tokens = [(ttype, value) for _, ttype, value in
+                  lexer.get_tokens_unprocessed(text[pos:end])]
+        line = first
+    elif _resumable(lexer) and start[2] is not None and \
+            not [state for state in start[2] if state not in lexer._tokens]:
+        line, pos, stack = start
+        tokens = ((ttype, value) for _, ttype, value in
+                  _lex_with_states(lexer, text, pos, stack)
+                  if ttype is not None)
+    else:
+        line = 1
+        tokens = lexer.get_tokens(text)
+
+    tokens = _window_tokens(tokens, line, first, last)
+    html = u''.join(formatter.iter_format(tokens, last - first + 1, first))
+    return fill_anchors(html, paste_id), first, last, lines
+
+def render_checkpoints(source, language):
+    """Compute the checkpoints of ``source`` through the application's
+    highlighting engine, see `pastie.lib.highlightpool.HighlightPool`, or
+    ``None`` if it's too short to ever be windowed"""
+    every = int(config.get('highlight.checkpoint_lines', 1000))
+    if source.count('\n') <= every:
+        return None
+    engine = getattr(config.get('pylons.g'), 'highlighter', None)
+    if engine is None:
+        return compute_checkpoints(source, language, every)
+    return engine.checkpoints(source, language, every)
+
+def code_window(code, first, last):
+    """Like `pastie.lib.highlight.code_highlight`, for lines ``first`` to
+    ``last`` of paste ``code`` only. Returns ``(html, first, last, lines)``,
+    see `render_window`"""
+    checkpoints = None
+    rendered = code.rendered
+    if rendered is not None and rendered.version == RENDER_VERSION:
+        checkpoints = rendered.checkpoints
+    args = (code.code, code.language, code.id, first, last, checkpoints)
+    engine = getattr(config.get('pylons.g'), 'highlighter', None)
+    if engine is None:
+        return render_window(*args)
+    try:
+        return engine.window(*args)
+    except HighlightFailed:
+        return render_window(*args, plain=True)
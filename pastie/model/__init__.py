@@ -1,4 +1,5 @@
 from metadata import metadata, Session
 
-from pasties import Tag, Paste
+from bodies import Body
+from pasties import Tag, Paste, RenderedPaste
 import forms
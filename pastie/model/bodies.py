@@ -0,0 +1,233 @@
+"""Content addressed storage of the pastes' code
+
+The code of the pastes is kept in the ``bodies`` table, keyed by its sha1,
+so identical pastes share one body. Bodies are reference counted, a body is
+deleted along with the last paste using it. A body can be stored as a delta
+against another one, see `pastie.lib.delta`, which it then holds a reference
+to.
+
+With ``paste.compression`` set to ``gzip`` the bodies over
+``paste.compression_min_size`` bytes are stored gzip compressed, when that's
+smaller, so that they can also be sent as is to the clients accepting gzip.
+
+The ``data`` column is deferred: a body's other columns tell how its code
+is stored and how long it is, and the bodies stored as sent can be streamed
+straight from the database, see `iter_body_data`, without loading them.
+"""
+import gzip
+import hashlib
+from cStringIO import StringIO
+
+from pylons import config
+from sqlalchemy import Column, ForeignKey, func, select, Table, types
+from sqlalchemy.orm import deferred, mapper, object_session, relation
+
+from pastie.lib.delta import apply_delta, make_delta
+from pastie.lib.highlight import CHUNK_SIZE
+from pastie.model.common import insert_unique
+from pastie.model.metadata import metadata, Session
+
+body_table = Table('bodies', metadata,
+    Column('hash', types.String(40), primary_key=True),
+    Column('refcount', types.Integer, nullable=False),
+    Column('size', types.Integer, nullable=False),
+    # When set, data is a delta against that body
+    Column('base_hash', types.String(40), ForeignKey('bodies.hash'),
+           nullable=True),
+    Column('depth', types.Integer, nullable=False, default=0),
+    # How data is encoded, 'utf-8' or 'gzip', utf-8 then gzip compressed
+    Column('encoding', types.String(10), nullable=False),
+    # Length in bytes of the code utf-8 encoded, NULL for the bodies stored
+    # before it was kept
+    Column('length', types.Integer, nullable=True),
+    Column('data', types.Binary, nullable=False)
+)
+
+def body_hash(code):
+    """The key of the body holding ``code``"""
+    return hashlib.sha1(code.encode('utf-8')).hexdigest()
+
+def gzip_compress(data):
+    """Compress ``data`` in the gzip format, leaving the modification time
+    out so the same data always compresses the same"""
+    out = StringIO()
+    compressed = gzip.GzipFile(fileobj=out, mode='wb', mtime=0)
+    try:
+        compressed.write(data)
+    finally:
+        compressed.close()
+    return out.getvalue()
+
+def gzip_decompress(data):
+    return gzip.GzipFile(fileobj=StringIO(data), mode='rb').read()
+
+class Body(object):
+    """The code of one or more pastes"""
+    def __init__(self, code):
+        self.hash = body_hash(code)
+        self.refcount = 1
+        self.size = len(code)
+        self.length = len(code.encode('utf-8'))
+        self.depth = 0
+        self.store(code)
+        self._text = code
+
+    def store(self, text):
+        """Store ``text``, compressed if configured to and worth it"""
+        data = text.encode('utf-8')
+        self.encoding = 'utf-8'
+        if config.get('paste.compression') == 'gzip' and \
+                len(data) >= int(config.get('paste.compression_min_size',
+                                            256)):
+            compressed = gzip_compress(data)
+            if len(compressed) < len(data):
+                data = compressed
+                self.encoding = 'gzip'
+        self.data = data
+
+    def load(self):
+        """The text stored, decompressed"""
+        data = str(self.data)
+        if self.encoding == 'gzip':
+            data = gzip_decompress(data)
+        return data.decode('utf-8')
+
+    def stored_as(self, encoding):
+        """Whether the data stored is the code ``encoding`` encoded, as
+        sent with that encoding, ``utf-8`` or ``gzip``"""
+        return self.encoding == encoding and self.base_hash is None
+
+    @property
+    def gzip_data(self):
+        """The code gzip compressed as stored, or ``None`` if it isn't
+        stored that way"""
+        if self.stored_as('gzip'):
+            return str(self.data)
+        return None
+
+    def data_length(self):
+        """Length in bytes of the data stored, without loading it"""
+        if 'data' in self.__dict__:
+            return len(self.data)
+        return object_session(self).execute(
+            select([func.length(body_table.c.data)],
+                   body_table.c.hash == self.hash)).scalar()
+
+    def encoded_length(self):
+        """Length in bytes of the code utf-8 encoded"""
+        if self.length is None:
+            return len(self.text.encode('utf-8'))
+        return self.length
+
+    @property
+    def delta(self):
+        """The delta against the base body, see `pastie.lib.delta`, or
+        ``None``"""
+        if self.base_hash is None:
+            return None
+        return self.load()
+
+    @classmethod
+    def acquire(cls, code, base=None):
+        """Return the body holding ``code``, with one more reference to it,
+        creating it if needed. A new body is stored as a delta against body
+        ``base`` when that's worth it, see `store_delta`.
+
+        The body is inserted right away, see
+        `pastie.model.common.insert_unique`; if another transaction stored
+        the same code meanwhile, its body is used instead."""
+        hash = body_hash(code)
+        body = Session.query(cls).get(hash)
+        if body is None:
+            body = cls(code)
+            if base is not None:
+                body.store_delta(base)
+            values = dict((column.name, getattr(body, column.name))
+                          for column in body_table.c)
+            if insert_unique(body_table, values):
+                if body.base_hash is not None:
+                    base.refcount = body_table.c.refcount + 1
+                body = Session.query(cls).get(hash)
+                body._text = code
+                return body
+            body = Session.query(cls).get(hash)
+        body.refcount = body_table.c.refcount + 1
+        return body
+
+    def store_delta(self, base):
+        """Store the code as a delta against body ``base``, unless that makes
+        the chain of deltas deeper than ``paste.delta_max_depth`` or the
+        delta isn't smaller than the code. The reference to ``base`` is
+        counted by `acquire`."""
+        depth = base.depth + 1
+        if depth > int(config.get('paste.delta_max_depth', 8)):
+            return
+        delta = make_delta(base.text, self.text,
+                           int(config.get('diff.max_work', 1000000)))
+        if delta is None:
+            return
+        self.store(delta)
+        self.depth = depth
+        self.base = base
+        self.base_hash = base.hash
+
+    @property
+    def text(self):
+        """The code, rebuilt from the base bodies for deltas, once per
+        instance; bodies don't change"""
+        text = getattr(self, '_text', None)
+        if text is None:
+            if self.base_hash is None:
+                text = self.load()
+            else:
+                text = apply_delta(self.base.text, self.load())
+            self._text = text
+        return text
+
+def release_body(connection, hash):
+    """Drop a reference to body ``hash``, deleting it, and releasing its
+    base, if it was the last one. Returns the hashes of the deleted
+    bodies."""
+    deleted = []
+    while hash is not None:
+        connection.execute(body_table.update(body_table.c.hash == hash,
+            values={body_table.c.refcount: body_table.c.refcount - 1}))
+        row = connection.execute(
+            body_table.select(body_table.c.hash == hash)).fetchone()
+        if row is None or row.refcount > 0:
+            break
+        connection.execute(body_table.delete(body_table.c.hash == hash))
+        deleted.append(hash)
+        hash = row.base_hash
+    return deleted
+
+def iter_body_data(hash, start=0, stop=None, chunk_size=CHUNK_SIZE):
+    """Generator of the bytes ``start`` to ``stop`` of the data stored for
+    body ``hash``, read ``chunk_size`` bytes at a time.
+
+    The generator is consumed after the request's session is gone, it
+    reads on a connection of its own."""
+    connection = config['pylons.g'].sa_engine.connect()
+    try:
+        if stop is None:
+            stop = connection.execute(
+                select([func.length(body_table.c.data)],
+                       body_table.c.hash == hash)).scalar() or 0
+        while start < stop:
+            count = min(chunk_size, stop - start)
+            # SQL strings start at 1
+            chunk = connection.execute(
+                select([func.substr(body_table.c.data, start + 1, count)],
+                       body_table.c.hash == hash)).scalar()
+            if not chunk:
+                # Deleted meanwhile
+                break
+            yield str(chunk)
+            start += count
+    finally:
+        connection.close()
+
+mapper(Body, body_table, properties=dict(
+    base=relation(Body, remote_side=[body_table.c.hash]),
+    data=deferred(body_table.c.data)
+))
@@ -1,14 +1,116 @@
 """Common tables and classes for use by Pastie"""
+from sqlalchemy import select
+from sqlalchemy.exceptions import IntegrityError
+
 from metadata import Column, mapper, metadata, types, Session, Table
 
 tag_table = Table('tags', metadata,
     Column('id', types.Integer, primary_key=True),
-    Column('name', types.String(30), nullable=False),
+    Column('name', types.String(30), nullable=False, unique=True),
+    # Number of pastes tagged, kept up to date along with paste_tags
+    Column('paste_count', types.Integer, nullable=False, default=0),
+    # Bumped whenever a paste is tagged or untagged, see pastie.lib.caching
+    Column('generation', types.Integer, nullable=False, default=0),
+)
+
+# Counts kept up to date as rows are inserted and deleted, so listings don't
+# have to count them, e.g. 'pastes', see pastie.model.pasties.PasteCounts
+counter_table = Table('counters', metadata,
+    Column('name', types.String(50), primary_key=True),
+    Column('value', types.Integer, nullable=False),
 )
 
+def counter_value(name):
+    """The value of counter ``name``, ``None`` if it isn't set up"""
+    return Session.execute(select([counter_table.c.value],
+                                  counter_table.c.name == name)).scalar()
+
+def bump_counter(connection, name, amount=1):
+    """Add ``amount`` to counter ``name``, if it's set up"""
+    connection.execute(counter_table.update(counter_table.c.name == name,
+        values={counter_table.c.value: counter_table.c.value + amount}))
+
 class Tag(object):
     def __init__(self, name):
         """Create a new Tag object with ``name``"""
         self.name = name
+        self.paste_count = 0
+        self.generation = 0
+
+    @classmethod
+    def paste_count_for(cls, name):
+        """The number of pastes tagged ``name``, without loading the tag"""
+        return Session.execute(select([tag_table.c.paste_count],
+                                      tag_table.c.name == name)).scalar() or 0
+
+    @classmethod
+    def generation_for(cls, name):
+        """The generation of the pastes tagged ``name``, changing whenever
+        a paste is tagged or untagged with it"""
+        return Session.execute(select([tag_table.c.generation],
+                                      tag_table.c.name == name)).scalar() or 0
+
+    @classmethod
+    def resolve(cls, names):
+        """Return the tags named ``names``, in that order, creating the
+        missing ones: one query finds the existing tags, one inserts the
+        missing ones and one loads them"""
+        query = Session.query(cls)
+        tags = dict((tag.name, tag) for tag in
+                    query.filter(tag_table.c.name.in_(names)))
+        missing = [name for name in names if name not in tags]
+        if missing:
+            insert_tags(missing)
+            tags.update((tag.name, tag) for tag in
+                        query.filter(tag_table.c.name.in_(missing)))
+        return [tags[name] for name in names]
+
+def insert_unique(table, values):
+    """Insert the row ``values`` into ``table`` unless there's already one
+    with the same key, which another transaction may have inserted since it
+    was looked for. Returns whether the row was inserted.
+
+    SQLite only rolls the failed statement back, the other databases
+    insert the row from a savepoint, rolled back on conflict; pysqlite
+    doesn't support savepoints."""
+    sqlite = Session().bind.name == 'sqlite'
+    if not sqlite:
+        Session.begin_nested()
+    try:
+        Session.execute(table.insert(), values)
+    except IntegrityError:
+        if not sqlite:
+            Session.rollback()
+        return False
+    if not sqlite:
+        Session.commit()
+    return True
+
+def insert_tags(names):
+    """Insert the tags named ``names`` in one statement. Another transaction
+    inserting some of them first is recovered from by inserting what's still
+    missing again, from a savepoint but on SQLite, see `insert_unique`."""
+    sqlite = Session().bind.name == 'sqlite'
+    for attempt in range(3):
+        if not sqlite:
+            Session.begin_nested()
+        try:
+            Session.execute(tag_table.insert(),
+                            [dict(name=name, paste_count=0, generation=0)
+                             for name in names])
+        except IntegrityError:
+            if not sqlite:
+                Session.rollback()
+            if attempt == 2:
+                raise
+        else:
+            if not sqlite:
+                Session.commit()
+            return
+        existing = set(row[0] for row in Session.execute(
+            select([tag_table.c.name], tag_table.c.name.in_(names))))
+        names = [name for name in names if name not in existing]
+        if not names:
+            return
 
 mapper(Tag, tag_table)
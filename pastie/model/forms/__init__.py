@@ -3,9 +3,9 @@ from formencode.validators import *
 from formencode.compound import All
 from pastie.model.forms.validators import *
 
-from pygments.lexers import get_all_lexers
+from pastie.lib.registry import LanguageList
 
-languagelist = [lang[1][0] for lang in get_all_lexers()]
+languagelist = LanguageList()
 
 class myschema(schema.Schema):
     allow_extra_fields = True
@@ -1,13 +1,23 @@
 """Pastebin tables and classes"""
-from datetime import datetime
+from datetime import datetime, timedelta
 import math
-import difflib
 
-from sqlalchemy import desc, Column, ForeignKey, func, select, Table, types
-from sqlalchemy.orm import backref, mapper, relation
+from paste.deploy.converters import asbool
+from pylons import config
+from sqlalchemy import and_, desc, Column, ForeignKey, func, Index, select, \
+    Table, types
+from sqlalchemy.orm import backref, deferred, eagerload, mapper, \
+    object_session, relation, undefer, MapperExtension, EXT_CONTINUE
 
+from pastie.lib.delta import delta_blocks
+from pastie.lib.diff import DiffTooLarge, unified_diff
+from pastie.lib.highlight import highlight_source, render_plain, \
+    CHUNK_SIZE, CodeTooLarge, HighlightFailed, FALLBACK_VERSION, \
+    OVERSIZE_VERSION, RENDER_VERSION
+from pastie.lib.windowing import render_checkpoints
+from pastie.model.bodies import Body, release_body
 from pastie.model.metadata import metadata, Session
-from pastie.model.common import tag_table, Tag
+from pastie.model.common import bump_counter, insert_unique, tag_table, Tag
 
 #mapper = Session.mapper
 
@@ -17,12 +27,22 @@ paste_table = Table('pastes', metadata,
     Column('title', types.Unicode(60)),
     Column('date', types.DateTime, nullable=False),
     Column('language', types.String(30), nullable=False),
-    Column('code', types.Text(convert_unicode=True, assert_unicode='warn'),
+    Column('body_hash', types.String(40), ForeignKey('bodies.hash'),
            nullable=False),
     Column('parent_id', types.Integer, ForeignKey('pastes.id'), nullable=True,
-           default=None)
+           default=None),
+    # Maintained on insert so a whole tree can be loaded at once, root_id is
+    # NULL for the roots themselves
+    Column('root_id', types.Integer, ForeignKey('pastes.id'), nullable=True,
+           default=None, index=True),
+    Column('depth', types.Integer, nullable=False, default=0),
+    Column('child_count', types.Integer, nullable=False, default=0)
 )
 
+# The listings are paged by seeking on (date, id), see
+# pastie.lib.paginator.KeysetPage
+Index('ix_pastes_date_id', paste_table.c.date, paste_table.c.id)
+
 pastetags_table = Table('paste_tags', metadata,
     Column('tag_id', types.Integer,
            ForeignKey('tags.id', ondelete='RESTRICT'), primary_key=True),
@@ -30,6 +50,79 @@ pastetags_table = Table('paste_tags', metadata,
            ForeignKey('pastes.id', ondelete='CASCADE'), primary_key=True),
 )
 
+# Renders are shared by the pastes with the same body and language, their
+# line anchors are filled in when served, see pastie.lib.highlight. The html
+# column is deferred, streamed pages read it a chunk at a time, see
+# iter_rendered_html.
+rendered_table = Table('rendered_pastes', metadata,
+    Column('body_hash', types.String(40),
+           ForeignKey('bodies.hash', ondelete='CASCADE'), primary_key=True),
+    Column('language', types.String(30), primary_key=True),
+    Column('version', types.String(40), nullable=False),
+    Column('html', types.Text(convert_unicode=True), nullable=False),
+    Column('checkpoints', types.PickleType, nullable=True),
+    Column('date', types.DateTime, nullable=False)
+)
+
+class RenderedPaste(object):
+    """The highlighted HTML of a paste, produced once when it's created"""
+    def __init__(self, body_hash, language, html, checkpoints=None,
+                 version=RENDER_VERSION):
+        self.body_hash = body_hash
+        self.language = language
+        self.html = html
+        self.checkpoints = checkpoints
+        self.version = version
+        self.date = datetime.now()
+
+def iter_rendered_html(body_hash, language, chunk_size=CHUNK_SIZE):
+    """Generator of the HTML of the render stored for body ``body_hash`` as
+    ``language``, read ``chunk_size`` characters at a time.
+
+    The generator is consumed after the request's session is gone, it
+    reads on a connection of its own, see
+    `pastie.model.bodies.iter_body_data`."""
+    where = and_(rendered_table.c.body_hash == body_hash,
+                 rendered_table.c.language == language)
+    connection = config['pylons.g'].sa_engine.connect()
+    try:
+        length = connection.execute(
+            select([func.length(rendered_table.c.html)], where)).scalar() or 0
+        start = 0
+        while start < length:
+            # SQL strings start at 1
+            chunk = connection.execute(select(
+                [func.substr(rendered_table.c.html, start + 1, chunk_size,
+                             type_=rendered_table.c.html.type)],
+                where)).scalar()
+            if not chunk:
+                # Deleted meanwhile
+                break
+            yield chunk
+            start += chunk_size
+    finally:
+        connection.close()
+
+# Options of the paste queries by loading profile, see Paste.query_for. The
+# code is in the bodies table and the tags are loaded lazily unless a
+# profile says otherwise.
+LOADING_PROFILES = {
+    # Listings, the pastes' columns only; the tags of the whole page are
+    # loaded at once with Paste.load_tags
+    'listing': [],
+    # The paste page: code, render and tags
+    'full': [eagerload('body'), undefer('body.data'), eagerload('rendered'),
+             eagerload('tags')],
+    # Trees of replies, like the listings
+    'tree': [],
+    # Previews and comparisons, the code only
+    'code': [eagerload('body'), undefer('body.data')],
+    # Conditional requests and downloads, the columns the validators are
+    # made of; the body is loaded lazily, only when the client's copy isn't
+    # current, and without its data, see pastie.model.bodies
+    'validators': [],
+}
+
 class Paste(object):
     def __init__(self, author=None, title='', language=None,
                  code='', tags='', parent_id=None):
@@ -38,20 +131,62 @@ class Paste(object):
         self.author = author
         self.title = title
         self.language = language
-        self.code = code
         self.date = datetime.now()
         self.parent_id = parent_id
+        self.depth = self.child_count = 0
+        base = None
+        parent = parent_id and Session.query(Paste).get(int(parent_id))
+        if parent:
+            self.root_id = parent.root_id or parent.id
+            self.depth = parent.depth + 1
+            parent.child_count = paste_table.c.child_count + 1
+            if asbool(config.get('paste.delta_storage', False)):
+                # Replies are stored as deltas against the code they reply to
+                base = parent.body
+        self.body = Body.acquire(code, base)
+        Session.save(self)
         if tags:
-            taglist = tags.replace(',',' ').strip().split(' ')
-            for newtag in taglist:
+            names = []
+            for newtag in tags.replace(',',' ').strip().split(' '):
                 newtag = str(newtag.strip().encode('ascii', 'ignore'))
-                if not newtag:
-                    continue
-                ltag = Session.query(Tag).filter_by(name=newtag).first()
-                if not ltag:
-                    ltag = Tag(newtag)
-                    Session.save(ltag)
-                self.tags.append(ltag)
+                if newtag and newtag not in names:
+                    names.append(newtag)
+            if names:
+                self.tags.extend(Tag.resolve(names))
+                Session.execute(tag_table.update(
+                    tag_table.c.name.in_(names),
+                    values={tag_table.c.paste_count:
+                            tag_table.c.paste_count + 1,
+                            tag_table.c.generation:
+                            tag_table.c.generation + 1}))
+
+    @property
+    def code(self):
+        return self.body.text
+
+    @classmethod
+    def query_for(cls, profile):
+        """Query of the pastes loading what loading profile ``profile``
+        tells, see `LOADING_PROFILES`"""
+        return Session.query(cls).options(*LOADING_PROFILES[profile])
+
+    @staticmethod
+    def load_tags(pastes):
+        """Load the tags of ``pastes`` in one query, rather than one query
+        per paste when they're used"""
+        tags = dict((paste.id, []) for paste in pastes
+                    if 'tags' not in paste.__dict__)
+        if not tags:
+            return
+        query = Session.query(Tag).add_column(pastetags_table.c.paste_id) \
+            .filter(tag_table.c.id == pastetags_table.c.tag_id) \
+            .filter(pastetags_table.c.paste_id.in_(tags.keys()))
+        for tag, paste_id in query:
+            tags[paste_id].append(tag)
+        for paste in pastes:
+            if paste.id in tags:
+                Paste.tags.impl.set_committed_value(paste._state,
+                                                    tags[paste.id])
 
     @classmethod
     def recent(cls, count=5):
@@ -62,53 +197,212 @@ class Paste(object):
         """This method returns all the tags and their relative size
         for a tagcloud"""
         results = Session.execute(
-            select([tag_table.c.name, func.count(tag_table.c.name)],
-                   from_obj=[tag_table.join(pastetags_table).join(paste_table)],
-                   group_by=[tag_table.c.name])
+            select([tag_table.c.name, tag_table.c.paste_count],
+                   tag_table.c.paste_count > 0,
+                   order_by=[tag_table.c.name])
         )
         tag_counts = results.fetchall()
-        total = sum([tag[1] for tag in tag_counts])
         totalcounts = []
         for tag in tag_counts:
             weight = (math.log(tag[1] or 1) * 4) + 10
             totalcounts.append((tag[0], tag[1],weight))
-        return sorted(totalcounts, cmp=lambda x,y: cmp(x[0], y[0]))
+        return totalcounts
 
     @staticmethod
     def resolve_root(paste_id):
-        pastes = Session.query(Paste)
-        while True:
-            paste = pastes.filter(Paste.c.id == paste_id).first()
-            if paste is None:
-                return
-            if not paste.parent_id:
-                return paste
-            paste_id = paste.parent_id
+        query = Paste.query_for('tree')
+        paste = query.get(paste_id)
+        if paste is None or paste.root_id is None:
+            return paste
+        return query.get(paste.root_id)
+
+    def family(self):
+        """Load all the replies in this paste's tree in one query, returning
+        them as a dictionary of the lists of replies by parent id"""
+        pastes = Paste.query_for('tree').filter(
+            Paste.c.root_id == (self.root_id or self.id)).all()
+        Paste.load_tags(pastes + [self])
+        replies = {}
+        for paste in pastes:
+            replies.setdefault(paste.parent_id, []).append(paste)
+        return replies
+
+    def render(self):
+        """Highlight the paste's code and store the resulting HTML so it can
+        be served afterwards without running the lexer again. Pastes with
+        the same code and language share it.
+
+        Code which can't be highlighted within the time budget this time is
+        stored as plain text, stamped `FALLBACK_VERSION`, to be redone
+        later, see `needs_render`. Code over the size budget is stored as
+        plain text for good, stamped `OVERSIZE_VERSION`."""
+        rendered = self.rendered
+        if rendered is not None and rendered.version == RENDER_VERSION:
+            return rendered
+        try:
+            html = highlight_source(self.code, self.language, fallback=False)
+            checkpoints = render_checkpoints(self.code, self.language)
+            version = RENDER_VERSION
+        except CodeTooLarge:
+            html = render_plain(self.code)
+            checkpoints = None
+            version = OVERSIZE_VERSION
+        except HighlightFailed:
+            html = render_plain(self.code)
+            checkpoints = None
+            version = FALLBACK_VERSION
+        if rendered is None:
+            values = dict(body_hash=self.body.hash, language=self.language,
+                          html=html, checkpoints=checkpoints,
+                          version=version, date=datetime.now())
+            if not insert_unique(rendered_table, values):
+                # Rendered meanwhile by another request, replace it
+                Session.execute(rendered_table.update(and_(
+                    rendered_table.c.body_hash == self.body.hash,
+                    rendered_table.c.language == self.language),
+                    values=values))
+            rendered = Session.query(RenderedPaste).populate_existing() \
+                .get((self.body.hash, self.language))
+            self.rendered = rendered
+        else:
+            rendered.html = html
+            rendered.checkpoints = checkpoints
+            rendered.version = version
+            rendered.date = datetime.now()
+        return rendered
+
+    def needs_render(self):
+        """Whether the paste's render should be (re)done: there's none of
+        this version, or only its plain text fallback, stored over
+        ``highlight.retry_after`` seconds ago. The code over the size
+        budget is never highlighted, its plain text isn't redone."""
+        rendered = self.rendered
+        if rendered is None:
+            return True
+        if rendered.version == OVERSIZE_VERSION:
+            return False
+        if rendered.version == FALLBACK_VERSION:
+            retry_after = int(config.get('highlight.retry_after', 300))
+            return datetime.now() - rendered.date > \
+                timedelta(seconds=retry_after)
+        return rendered.version != RENDER_VERSION
 
     def compare_to(self, other, context_lines=4):
+        """Unified diff of this paste's code against ``other``'s, a `Paste`
+        or its id. Diffs are kept in the application's diff cache, see
+        `pastie.lib.store.LRUStore`."""
+        other_id = isinstance(other, Paste) and other.id or int(other)
+        store = getattr(config.get('pylons.g'), 'diff_cache', None)
+        key = '%d:%d:%d' % (self.id, other_id, context_lines)
+        if store is not None:
+            udiff = store.get(key)
+            if udiff is not None:
+                return udiff.decode('utf-8')
+
         if not isinstance(other, Paste):
-            other = Session.query(Paste).get(int(other))
-        udiff = u'\n'.join(difflib.unified_diff(
-            self.code.splitlines(),
-            other.code.splitlines(),
-            fromfile='Paste #%d' % self.id,
-            tofile='Paste #%d' % other.id,
-            lineterm='',
-            n=context_lines)
-        )
+            other = Paste.query_for('code').get(other_id)
+        lines, other_lines = self.code.splitlines(), other.code.splitlines()
+        blocks = None
+        if self.body.base_hash is not None and \
+                self.body.base_hash == other.body.hash:
+            # The delta already tells the lines in common
+            blocks = [(line, start, count) for start, line, count in
+                      delta_blocks(self.body.delta)]
+            blocks.append((len(lines), len(other_lines), 0))
+        try:
+            udiff = u'\n'.join(unified_diff(
+                lines, other_lines,
+                fromfile='Paste #%d' % self.id,
+                tofile='Paste #%d' % other.id,
+                n=context_lines,
+                max_work=int(config.get('diff.max_work', 1000000)),
+                blocks=blocks))
+        except DiffTooLarge:
+            udiff = u'Pastes #%d and #%d differ too much to be compared' % (
+                self.id, other.id)
+        if store is not None:
+            store.set(key, udiff.encode('utf-8'))
         return udiff
 
+class BodyReferences(MapperExtension):
+    """Release the bodies of the deleted pastes, see
+    `pastie.model.bodies.release_body`, and the renders of the bodies which
+    are gone"""
+
+    def after_delete(self, mapper, connection, instance):
+        session = object_session(instance)
+        for hash in release_body(connection, instance.body_hash):
+            connection.execute(rendered_table.delete(
+                rendered_table.c.body_hash == hash))
+            # Pasting the same code again must create the body again
+            body = session.identity_map.get(session.identity_key(Body, hash))
+            if body is not None:
+                session.expunge(body)
+        return EXT_CONTINUE
+
+class TagCounts(MapperExtension):
+    """Keep the number of pastes of the tags of the deleted pastes"""
+
+    def before_delete(self, mapper, connection, instance):
+        if instance.tags:
+            connection.execute(tag_table.update(
+                tag_table.c.id.in_([tag.id for tag in instance.tags]),
+                values={tag_table.c.paste_count:
+                        tag_table.c.paste_count - 1,
+                        tag_table.c.generation:
+                        tag_table.c.generation + 1}))
+        return EXT_CONTINUE
+
+class ChildCounts(MapperExtension):
+    """Keep the number of replies of the parents of the deleted pastes"""
+
+    def after_delete(self, mapper, connection, instance):
+        if instance.parent_id:
+            connection.execute(paste_table.update(
+                paste_table.c.id == instance.parent_id,
+                values={paste_table.c.child_count:
+                        paste_table.c.child_count - 1}))
+        return EXT_CONTINUE
+
+class PasteCounts(MapperExtension):
+    """Keep the 'pastes' counter, the number of pastes, and the
+    'generation:pastes' one, bumped whenever a paste is added or removed,
+    see `pastie.lib.caching`"""
+
+    def after_insert(self, mapper, connection, instance):
+        bump_counter(connection, 'pastes', 1)
+        bump_counter(connection, 'generation:pastes', 1)
+        return EXT_CONTINUE
+
+    def after_delete(self, mapper, connection, instance):
+        bump_counter(connection, 'pastes', -1)
+        bump_counter(connection, 'generation:pastes', 1)
+        return EXT_CONTINUE
+
+mapper(RenderedPaste, rendered_table, properties=dict(
+    html=deferred(rendered_table.c.html)
+))
+
 mapper(Paste, paste_table,
     properties=dict(
-        tags=relation(Tag, secondary=pastetags_table, lazy=False,
+        body=relation(Body),
+        rendered=relation(RenderedPaste, uselist=False, viewonly=True,
+                          primaryjoin=and_(
+                            rendered_table.c.body_hash==paste_table.c.body_hash,
+                            rendered_table.c.language==paste_table.c.language),
+                          foreign_keys=[rendered_table.c.body_hash,
+                                        rendered_table.c.language]),
+        tags=relation(Tag, secondary=pastetags_table,
                       backref=backref('pastes',
                                       order_by=desc(paste_table.c.date))),
         children=relation(Paste,
                           primaryjoin=paste_table.c.parent_id==paste_table.c.id,
                           cascade='all',
                           backref=backref('parent',
-                                          remote_side=[paste_table.c.id]))
+                            primaryjoin=paste_table.c.parent_id==paste_table.c.id,
+                            remote_side=[paste_table.c.id]))
     ),
-    order_by=[desc(paste_table.c.date)]
+    order_by=[desc(paste_table.c.date)],
+    extension=[BodyReferences(), TagCounts(), ChildCounts(), PasteCounts()]
 )
 
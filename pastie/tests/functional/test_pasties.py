@@ -1,7 +1,76 @@
 from pastie.tests import *
+from pastie.lib.conditional import parse_http_date
+from pastie.model import Paste, Session
+
+CODE = u'print "conditional"\n'
 
 class TestPastiesController(TestController):
 
+    def _paste(self, code=CODE, parent_id=None):
+        paste = Paste('author', 'title', 'python', code, parent_id=parent_id)
+        Session.commit()
+        return paste
+
+    def _assert_immutable(self, response):
+        assert 'immutable' in response.header('Cache-Control')
+        assert 'max-age=31536000' in response.header('Cache-Control')
+        assert parse_http_date(response.header('Expires')) > \
+            parse_http_date(response.header('Last-Modified'))
+        assert not response.header('Pragma', None)
+
+    def _assert_not_modified(self, url, response):
+        for name in ('ETag', 'Last-Modified'):
+            assert response.header(name)
+        for headers in ({'If-None-Match': response.header('ETag')},
+                        {'If-Modified-Since':
+                         response.header('Last-Modified')}):
+            not_modified = self.app.get(url, headers=headers, status=304)
+            assert not_modified.body == ''
+            assert not not_modified.header('Content-Type', None)
+            assert not_modified.header('ETag') == response.header('ETag')
+            self._assert_immutable(not_modified)
+        # Another version
+        self.app.get(url, headers={'If-None-Match': '"other"'}, status=200)
+
     def test_index(self):
         response = self.app.get(url_for(controller='pasties'))
         # Test response...
+
+    def test_preview_not_found(self):
+        response = self.app.get(url_for('pastepreview', id='nan'), status=404)
+
+    def test_download(self):
+        url = url_for('rawpaste', id=self._paste().id)
+        response = self.app.get(url)
+        assert response.body == CODE.encode('utf-8')
+        assert response.header('Accept-Ranges') == 'bytes'
+        assert response.header('Content-Type').startswith('text/x-python')
+        self._assert_immutable(response)
+        self._assert_not_modified(url, response)
+
+    def test_download_range(self):
+        url = url_for('rawpaste', id=self._paste().id)
+        length = len(CODE.encode('utf-8'))
+        response = self.app.get(url, headers={'Range': 'bytes=0-4'},
+                                status=206)
+        assert response.body == 'print'
+        assert response.header('Content-Range') == 'bytes 0-4/%d' % length
+        response = self.app.get(url, headers={'Range': 'bytes=-11'},
+                                status=206)
+        assert response.body == CODE[-11:]
+        response = self.app.get(url, headers={'Range': 'bytes=%d-' % length},
+                                status=416)
+        assert response.header('Content-Range') == 'bytes */%d' % length
+        # Ranges of another version are ignored
+        response = self.app.get(url, headers={'Range': 'bytes=0-4',
+                                              'If-Range': '"other"'},
+                                status=200)
+        assert response.body == CODE.encode('utf-8')
+
+    def test_diff(self):
+        parent = self._paste()
+        reply = self._paste(CODE + u'print "reply"\n', parent.id)
+        url = url_for('diffpaste', id=reply.id, parent=parent.id)
+        response = self.app.get(url)
+        self._assert_immutable(response)
+        self._assert_not_modified(url, response)
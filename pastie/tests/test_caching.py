@@ -0,0 +1,36 @@
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+
+from pastie.lib.caching import PageCaches
+
+class TestPageCaches(TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.filename = os.path.join(self.tmpdir, 'pages.db')
+        self.caches = PageCaches(self.filename, 1000, {'small.page': 100})
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_shared(self):
+        self.caches.get('pasties.list').set('key', dict(content=u'page'))
+        # As another process would see it
+        other = PageCaches(self.filename, 1000)
+        assert other.get('pasties.list').get('key') == dict(content=u'page')
+        assert other.get('pastetags.show').get('key') is None
+
+    def test_expire(self):
+        cache = self.caches.get('pasties.list')
+        cache.set('key', 'page', expire=-1)
+        assert cache.get('key') is None
+        cache.set('key', 'page', expire=60)
+        assert cache.get('key') == 'page'
+
+    def test_sizes(self):
+        self.caches.get('small.page').set('key', 'x' * 200)
+        assert self.caches.get('small.page').get('key') is None
+        self.caches.get('other.page').set('key', 'x' * 200)
+        assert self.caches.get('other.page').get('key') == 'x' * 200
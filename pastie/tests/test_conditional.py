@@ -0,0 +1,44 @@
+import time
+import calendar
+from datetime import datetime
+from unittest import TestCase
+
+from pastie.lib.conditional import etag_matches, http_date, make_etag, \
+    parse_http_date, parse_range, UnsatisfiableRange
+
+class TestConditional(TestCase):
+
+    def test_etag_matches(self):
+        etag = make_etag('download', 'abc', 'python')
+        assert etag == make_etag('download', 'abc', 'python')
+        assert etag != make_etag('download', 'abc', 'text')
+        assert etag_matches(etag, etag)
+        assert etag_matches('"other", W/%s' % etag, etag)
+        assert etag_matches('*', etag)
+        assert not etag_matches('"other"', etag)
+        assert not etag_matches(etag.strip('"'), etag)
+
+    def test_http_date(self):
+        date = datetime(2008, 3, 1, 12, 30, 15)
+        value = http_date(date)
+        assert value.endswith(' GMT')
+        assert parse_http_date(value) == time.mktime(date.timetuple())
+        assert parse_http_date('Sat, 01 Mar 2008 12:30:15 GMT') == \
+            calendar.timegm((2008, 3, 1, 12, 30, 15))
+        assert parse_http_date(value + '; length=12') == \
+            parse_http_date(value)
+        assert parse_http_date('yesterday') is None
+        assert parse_http_date(None) is None
+
+    def test_parse_range(self):
+        assert parse_range('bytes=0-9', 100) == (0, 10)
+        assert parse_range('bytes=90-', 100) == (90, 100)
+        assert parse_range('bytes=90-200', 100) == (90, 100)
+        assert parse_range('bytes=-10', 100) == (90, 100)
+        assert parse_range('bytes=-200', 100) == (0, 100)
+        assert parse_range('bytes=0-9,20-29', 100) is None
+        assert parse_range('bytes=9-0', 100) is None
+        assert parse_range('lines=0-9', 100) is None
+        assert parse_range('bytes=a-b', 100) is None
+        self.assertRaises(UnsatisfiableRange, parse_range, 'bytes=100-', 100)
+        self.assertRaises(UnsatisfiableRange, parse_range, 'bytes=-0', 100)
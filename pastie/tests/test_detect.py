@@ -0,0 +1,31 @@
+from unittest import TestCase
+
+from pastie.lib.detect import LanguageDetector
+from pastie.lib.registry import get_registry
+
+class TestLanguageDetector(TestCase):
+
+    def setUp(self):
+        self.detector = LanguageDetector(get_registry(), sample_size=64)
+
+    def test_mimetype(self):
+        assert self.detector.detect('', 'foo.c', 'text/x-python') == \
+            ('python', 'mimetype')
+
+    def test_filename(self):
+        assert self.detector.detect('', 'src/foo.py') == ('python', 'filename')
+        assert self.detector.detect('', 'Makefile') == ('make', 'filename')
+        assert self.detector.detect('', 'Makefile.am') == ('make', 'filename')
+
+    def test_shebang(self):
+        assert self.detector.detect('#!/usr/bin/env python2.7\npass\n') == \
+            ('python', 'shebang')
+        assert self.detector.detect('#!/bin/bash\nls\n') == ('bash', 'shebang')
+
+    def test_content_is_sampled(self):
+        code = 'x' * 64 + '\n<?xml version="1.0"?>\n'
+        assert self.detector.detect(code)[0] != 'xml'
+        assert self.detector.detect(code[65:]) == ('xml', 'content')
+
+    def test_default(self):
+        assert self.detector.detect('') == ('text', 'default')
@@ -0,0 +1,21 @@
+import difflib
+from unittest import TestCase
+
+from pastie.lib.diff import DiffTooLarge, unified_diff
+
+class TestUnifiedDiff(TestCase):
+
+    def test_same_as_difflib(self):
+        a = ['line %d' % i for i in range(30)]
+        b = a[:5] + ['inserted'] + a[5:20] + ['changed'] + a[21:]
+        expected = list(difflib.unified_diff(a, b, 'a', 'b', lineterm=''))
+        assert unified_diff(a, b, 'a', 'b') == expected
+
+    def test_equal(self):
+        assert unified_diff(['a', 'b'], ['a', 'b']) == []
+
+    def test_work_budget(self):
+        a = ['%d' % (i * i % 13) for i in range(500)]
+        b = ['%d' % (i * 3 % 13) for i in range(500)]
+        self.assertRaises(DiffTooLarge, unified_diff, a, b, max_work=1000)
+        assert unified_diff(a, b)
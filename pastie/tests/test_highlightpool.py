@@ -0,0 +1,54 @@
+import time
+import signal
+import threading
+from unittest import TestCase
+
+from pastie.lib.highlight import HighlightFailed
+from pastie.lib.highlightpool import HighlightPool
+
+def sleep(source, seconds):
+    time.sleep(seconds)
+    return source
+
+def stuck(source, seconds):
+    # Can't be interrupted
+    signal.signal(signal.SIGALRM, signal.SIG_IGN)
+    time.sleep(seconds)
+    return source
+
+class TestHighlightPool(TestCase):
+
+    def setUp(self):
+        self.pool = HighlightPool(processes=1, timeout=0.5)
+
+    def tearDown(self):
+        self.pool.close()
+
+    def test_render(self):
+        assert 'syntaxtable' in self.pool.render(u'print 1\n', 'python')
+
+    def test_queued_job_budget(self):
+        # The second job waits for the first one, its budget only starts
+        # once it's running
+        results = []
+        first = threading.Thread(target=lambda: results.append(
+            self.pool._call(sleep, ('first', 0.4))))
+        first.start()
+        assert self.pool._call(sleep, ('second', 0.4)) == 'second'
+        first.join()
+        assert results == ['first']
+
+    def test_over_budget(self):
+        self.assertRaises(HighlightFailed, self.pool._call, sleep,
+                          ('slow', 5))
+        assert self.pool._call(sleep, ('next', 0)) == 'next'
+        assert not self.pool.started
+
+    def test_stuck_worker(self):
+        self.pool.kill_after = 0.2
+        worker = self.pool.pool._pool[0].pid
+        self.assertRaises(HighlightFailed, self.pool._call, stuck,
+                          ('stuck', 30))
+        # Replaced by the pool
+        assert self.pool._call(sleep, ('next', 0)) == 'next'
+        assert self.pool.pool._pool[0].pid != worker
@@ -0,0 +1,315 @@
+from datetime import datetime, timedelta
+from unittest import TestCase
+
+from genshi import XML
+from pylons import config
+
+from pastie.tests import *
+from pastie.lib import helpers as h
+from pastie.lib import highlight
+from pastie.lib.highlight import HighlightFailed, FALLBACK_VERSION, \
+    OVERSIZE_VERSION, RENDER_VERSION
+from pastie.lib.highlightpool import HighlightPool
+from pastie.model import Session, Paste, Tag
+from pastie.model.bodies import iter_body_data
+from pastie.model.common import counter_table, counter_value, insert_tags, \
+    insert_unique
+
+class CountingLexer(object):
+    """Lexer counting the lines it has lexed so far"""
+    def __init__(self, lexer):
+        self.lexer = lexer
+        self.lines = 0
+
+    def __getattr__(self, name):
+        return getattr(self.lexer, name)
+
+    def get_tokens(self, text):
+        for ttype, value in self.lexer.get_tokens(text):
+            self.lines += value.count('\n')
+            yield ttype, value
+
+class TimingOutEngine(object):
+    """Highlighting engine always out of time"""
+
+    def render(self, source, language):
+        raise HighlightFailed('out of time')
+
+class TestPaste(TestCase):
+
+    def test_render(self):
+        paste = Paste('author', 'title', 'python', u'print 1\n')
+        Session.flush()
+        rendered = paste.render()
+        Session.commit()
+        assert rendered.version == RENDER_VERSION
+        assert 'paste-%d-line' % paste.id in unicode(h.code_highlight(paste))
+
+    def test_render_fallback(self):
+        paste = Paste('author', 'title', 'python', u'print "fallback"\n')
+        Session.flush()
+        g = config['pylons.g']
+        highlighter = getattr(g, 'highlighter', None)
+        g.highlighter = TimingOutEngine()
+        try:
+            rendered = paste.render()
+            Session.commit()
+            assert rendered.version == FALLBACK_VERSION
+            assert 'plain' in rendered.html
+            assert not paste.needs_render()
+            rendered.date = datetime.now() - timedelta(days=1)
+            assert paste.needs_render()
+        finally:
+            g.highlighter = highlighter
+        assert paste.render().version == RENDER_VERSION
+        Session.commit()
+        assert not paste.needs_render()
+
+    def test_render_oversize(self):
+        paste = Paste('author', 'title', 'python', u'print "oversize"\n')
+        Session.flush()
+        g = config['pylons.g']
+        highlighter = getattr(g, 'highlighter', None)
+        g.highlighter = HighlightPool(max_size=5)
+        try:
+            rendered = paste.render()
+            Session.commit()
+            assert rendered.version == OVERSIZE_VERSION
+            assert 'plain' in rendered.html
+            # Never retried
+            rendered.date = datetime.now() - timedelta(days=1)
+            assert not paste.needs_render()
+        finally:
+            g.highlighter = highlighter
+
+    def test_window(self):
+        code = u''.join([u'x = %d\n' % i for i in range(100)])
+        paste = Paste('author', 'title', 'python', code)
+        Session.flush()
+        html, first, last, lines = h.code_window(paste, 10, 19)
+        assert (first, last, lines) == (10, 19, 100)
+        assert 'paste-%d-line-10' % paste.id in html
+        g = config['pylons.g']
+        highlighter = getattr(g, 'highlighter', None)
+        # Over the size budget, as plain text
+        g.highlighter = HighlightPool(max_size=5)
+        try:
+            plain = h.code_window(paste, 10, 19)[0]
+        finally:
+            g.highlighter = highlighter
+        assert 'paste-%d-line-10' % paste.id in plain
+        assert '<span class="n">x</span>' in html
+        assert '<span class="n">x</span>' not in plain
+
+    def test_stream_render(self):
+        code = u''.join([u'x = %d\n' % i for i in range(2000)])
+        paste = Paste('author', 'title', 'python', code)
+        Session.flush()
+        expected = h.render_code(code, 'python', paste.id).encode('utf-8')
+        lexer = CountingLexer(highlight.get_lexer('python'))
+        highlight.lexers_cache['python'] = lexer
+        try:
+            chunks = h.iter_code_highlight(paste, chunk_size=1024)
+            first = chunks.next()
+            # The line numbers, sent before the code is lexed
+            assert lexer.lines == 0
+            assert 'paste-%d-line-1"' % paste.id in first
+            second = chunks.next()
+            # The first lines of code, sent before the lexer is done
+            assert 0 < lexer.lines < 2000
+            assert 'paste-%d-line-1"' % paste.id in second
+            assert first + second + ''.join(chunks) == expected
+            assert lexer.lines == 2000
+        finally:
+            highlight.lexers_cache['python'] = lexer.lexer
+
+        paste.render()
+        Session.commit()
+        Session.clear()
+        paste = Paste.query_for('full').get(paste.id)
+        assert 'html' not in paste.rendered.__dict__
+        chunks = list(h.iter_code_highlight(paste, chunk_size=1024))
+        assert len(chunks) > 1
+        assert ''.join(chunks) == expected
+
+    def test_stream_deadline(self):
+        code = u''.join([u'x = "<%d>"\n' % i for i in range(100)])
+        # Past the deadline after the first line, the rest is plain text
+        html = u''.join(highlight.iter_highlight(code, 'python', 0))
+        XML(html)
+        assert html.count('<span class="s2">') == 1
+        assert html.count('&quot;&lt;99&gt;&quot;') == 1
+        assert html.count('<a name="') == 100
+
+    def test_concurrent_render(self):
+        first = Paste('author', 'title', 'python', u'print "render"\n')
+        second = Paste('author', 'title', 'python', u'print "render"\n')
+        Session.flush()
+        # Loaded before the first render is stored, like another request
+        # would
+        assert second.rendered is None
+        first.render()
+        rendered = second.render()
+        Session.commit()
+        assert rendered is first.rendered
+        assert rendered.version == RENDER_VERSION
+
+    def test_insert_unique(self):
+        values = dict(name='insert-unique', value=1)
+        assert insert_unique(counter_table, values)
+        assert not insert_unique(counter_table, dict(values, value=2))
+        Session.commit()
+        assert counter_value('insert-unique') == 1
+
+    def test_store_delta(self):
+        code = u''.join([u'line %d\n' % i for i in range(100)])
+        config['paste.delta_storage'] = 'true'
+        try:
+            parent = Paste('author', 'title', 'text', code)
+            Session.flush()
+            reply = Paste('author', 'title', 'text',
+                          code + u'one more line\n', parent_id=parent.id)
+        finally:
+            del config['paste.delta_storage']
+        Session.commit()
+        base = parent.body
+        assert reply.body.base_hash == base.hash
+        assert reply.body.depth == 1
+        Session.refresh(base)
+        assert base.refcount == 2
+        assert reply.code == code + u'one more line\n'
+        assert reply.compare_to(parent).endswith(u'-one more line')
+        # Orphaned rather than deleted along with its parent
+        parent.children.remove(reply)
+        Session.delete(parent)
+        Session.commit()
+        Session.clear()
+        reply = Paste.query_for('code').get(reply.id)
+        assert reply.body.base.refcount == 1
+        assert reply.code == code + u'one more line\n'
+
+    def test_same_code_same_body(self):
+        first = Paste('author', 'title', 'python', u'print 2\n')
+        second = Paste('author', 'title', 'python', u'print 2\n')
+        Session.commit()
+        assert first.body is second.body
+        assert first.body.refcount == 2
+        Session.delete(first)
+        Session.commit()
+        Session.refresh(second.body)
+        assert second.body.refcount == 1
+        assert second.code == u'print 2\n'
+
+    def test_compressed_body(self):
+        code = u''.join([u'line %d\n' % i for i in range(1000)])
+        config['paste.compression'] = 'gzip'
+        try:
+            paste = Paste('author', 'title', 'text', code)
+        finally:
+            del config['paste.compression']
+        Session.commit()
+        assert paste.body.encoding == 'gzip'
+        assert paste.body.gzip_data is not None
+        assert paste.code == code
+        assert ''.join(iter_body_data(paste.body.hash)) == \
+            paste.body.gzip_data
+
+    def test_family(self):
+        root = Paste('author', 'title', 'text', u'root')
+        Session.flush()
+        reply = Paste('author', 'title', 'text', u'reply', parent_id=root.id)
+        Session.flush()
+        nested = Paste('author', 'title', 'text', u'nested',
+                       parent_id=reply.id)
+        Session.commit()
+        Session.refresh(root)
+        assert (nested.root_id, nested.depth) == (root.id, 2)
+        assert root.child_count == 1
+        assert Paste.resolve_root(nested.id) is root
+        assert root.family() == {root.id: [reply], reply.id: [nested]}
+
+    def test_tag_counts(self):
+        first = Paste('author', 'title', 'text', u'one', tags='counted')
+        second = Paste('author', 'title', 'text', u'two', tags='counted')
+        Session.commit()
+        assert ('counted', 2) in [size[:2] for size in Paste.tag_sizes()]
+        Session.delete(second)
+        Session.commit()
+        assert ('counted', 1) in [size[:2] for size in Paste.tag_sizes()]
+
+    def test_resolve_tags(self):
+        Paste('author', 'title', 'text', u'resolve\n', tags='resolve-old')
+        Session.commit()
+        old = Tag.resolve(['resolve-old'])[0]
+        tags = Tag.resolve(['resolve-new', 'resolve-old', 'resolve-other'])
+        assert [tag.name for tag in tags] == \
+            ['resolve-new', 'resolve-old', 'resolve-other']
+        assert tags[1] is old
+        paste = Paste('author', 'title', 'text', u'resolved\n',
+                      tags='resolve-new resolve-old resolve-other')
+        Session.commit()
+        assert [tag.name for tag in paste.tags] == \
+            ['resolve-new', 'resolve-old', 'resolve-other']
+        for name in ('resolve-new', 'resolve-old', 'resolve-other'):
+            assert Session.query(Tag).filter_by(name=name).count() == 1
+        assert Tag.paste_count_for('resolve-old') == 2
+        assert Tag.paste_count_for('resolve-new') == 1
+
+    def test_insert_tags_conflict(self):
+        # Inserted by another transaction since they were looked for
+        insert_tags(['conflict-first'])
+        insert_tags(['conflict-first', 'conflict-second'])
+        Session.commit()
+        names = [tag.name for tag in Session.query(Tag).filter(
+            Tag.name.in_(['conflict-first', 'conflict-second']))]
+        assert sorted(names) == ['conflict-first', 'conflict-second']
+
+    def test_load_tags(self):
+        first = Paste('author', 'title', 'text', u'one', tags='loaded one')
+        second = Paste('author', 'title', 'text', u'two', tags='loaded')
+        Session.commit()
+        Session.clear()
+        pastes = Paste.query_for('listing').filter(
+            Paste.c.id.in_([first.id, second.id])).all()
+        assert 'tags' not in pastes[0].__dict__
+        Paste.load_tags(pastes)
+        tags = dict((paste.id, sorted(tag.name for tag in paste.tags))
+                    for paste in pastes)
+        assert tags == {first.id: ['loaded', 'one'], second.id: ['loaded']}
+
+    def test_full_profile(self):
+        paste = Paste('author', 'title', 'python', u'print 1\n', tags='full')
+        Session.flush()
+        paste.render()
+        Session.commit()
+        Session.clear()
+        paste = Paste.query_for('full').get(paste.id)
+        for name in ('body', 'rendered', 'tags'):
+            assert name in paste.__dict__
+        assert 'data' in paste.body.__dict__
+
+    def test_stream_body(self):
+        code = u''.join([u'l\xefne %d\n' % i for i in range(100)])
+        encoded = code.encode('utf-8')
+        paste = Paste('author', 'title', 'text', code)
+        Session.commit()
+        Session.clear()
+        body = Paste.query_for('validators').get(paste.id).body
+        assert body.stored_as('utf-8')
+        assert body.encoded_length() == len(encoded)
+        assert body.data_length() == len(encoded)
+        assert 'data' not in body.__dict__
+        assert ''.join(iter_body_data(body.hash, chunk_size=100)) == encoded
+        assert ''.join(iter_body_data(body.hash, 5, 50, chunk_size=7)) == \
+            encoded[5:50]
+
+    def test_generations(self):
+        Paste('author', 'title', 'text', u'one', tags='generation')
+        Session.commit()
+        tag = Tag.generation_for('generation')
+        paste = Paste('author', 'title', 'text', u'two', tags='generation')
+        Session.commit()
+        assert Tag.generation_for('generation') == tag + 1
+        Session.delete(paste)
+        Session.commit()
+        assert Tag.generation_for('generation') == tag + 2
@@ -0,0 +1,100 @@
+from datetime import datetime
+from unittest import TestCase
+
+from pastie.tests import *
+from pastie.lib.paginator import CachedCount, CappedCount, CounterCount, \
+    ExactCount, get_wrapper, KeysetPage
+from pastie.model import Session, Paste
+from pastie.model.common import counter_table, counter_value
+from pastie.model.pasties import paste_table
+
+class TestKeysetPage(TestCase):
+
+    def setUp(self):
+        self.tag = 'keyset-%s' % self._testMethodName
+        self.ids = []
+        for i in range(7):
+            paste = Paste('author', 'title', 'text', u'keyset %d' % i,
+                          tags=self.tag)
+            # Pairs of pastes created at the same time
+            paste.date = datetime(2008, 1, 1, 0, 0, i // 2)
+            Session.flush()
+            self.ids.append(paste.id)
+        Session.commit()
+        self.ids.reverse()
+
+    def page(self, cursor=None, direction='older'):
+        query = Session.query(Paste).filter(Paste.tags.any(name=self.tag))
+        return KeysetPage(query, [paste_table.c.date, paste_table.c.id],
+                          cursor, direction, items_per_page=3)
+
+    def test_older(self):
+        first = self.page()
+        assert [paste.id for paste in first] == self.ids[:3]
+        assert not first.has_newer and first.has_older
+        second = self.page(first.older)
+        assert [paste.id for paste in second] == self.ids[3:6]
+        third = self.page(second.older)
+        assert [paste.id for paste in third] == self.ids[6:]
+        assert third.has_newer and not third.has_older
+        assert third.older is None
+
+    def test_newer(self):
+        third = self.page(self.page(self.page().older).older)
+        second = self.page(third.newer, 'newer')
+        assert [paste.id for paste in second] == self.ids[3:6]
+        # Back at the top, a full first page
+        first = self.page(second.newer, 'newer')
+        assert [paste.id for paste in first] == self.ids[:3]
+        assert not first.has_newer
+
+    def test_stable(self):
+        first = self.page()
+        Paste('author', 'title', 'text', u'keyset new', tags=self.tag)
+        Session.commit()
+        second = self.page(first.older)
+        assert [paste.id for paste in second] == self.ids[3:6]
+
+    def test_invalid_cursor(self):
+        assert [paste.id for paste in self.page('nonsense')] == self.ids[:3]
+
+class TestCounts(TestCase):
+
+    def setUp(self):
+        self.tag = 'count-%s' % self._testMethodName
+        for i in range(5):
+            Paste('author', 'title', 'text', u'count %d' % i, tags=self.tag)
+        Session.commit()
+        self.query = get_wrapper(
+            Session.query(Paste).filter(Paste.tags.any(name=self.tag)))
+
+    def test_exact(self):
+        assert ExactCount()(self.query) == (5, False)
+
+    def test_capped(self):
+        assert CappedCount(3)(self.query) == (3, True)
+        assert CappedCount(5)(self.query) == (5, False)
+
+    def test_cached(self):
+        count = CachedCount(ttl=60)
+        assert count(self.query) == (5, False)
+        Paste('author', 'title', 'text', u'count more', tags=self.tag)
+        Session.commit()
+        assert count(self.query) == (5, False)
+        assert CachedCount(ttl=0)(self.query) == (6, False)
+
+    def test_counter(self):
+        if counter_value('pastes') is None:
+            Session.execute(counter_table.insert(), dict(name='pastes',
+                                                         value=0))
+            Session.commit()
+        before = counter_value('pastes')
+        paste = Paste('author', 'title', 'text', u'count more', tags=self.tag)
+        Session.commit()
+        assert counter_value('pastes') == before + 1
+        count = CounterCount(lambda: counter_value('pastes'))
+        assert count(self.query) == (before + 1, False)
+        Session.delete(paste)
+        Session.commit()
+        assert counter_value('pastes') == before
+        assert CounterCount(lambda: None)(self.query) == (5, False)
@@ -0,0 +1,13 @@
+from unittest import TestCase
+
+from pastie.lib.registry import get_registry
+
+class TestLexerRegistry(TestCase):
+
+    def test_mimetype(self):
+        registry = get_registry()
+        assert registry.mimetype('python') == 'text/x-python'
+        assert registry.mimetype('py') == 'text/x-python'
+        # Lexers listing no mimetype
+        assert registry.mimetype('antlr') == 'text/plain'
+        assert registry.mimetype(None) == 'text/plain'
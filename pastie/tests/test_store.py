@@ -0,0 +1,47 @@
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+
+from pastie.lib.store import LRUStore
+
+class TestLRUStore(TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.store = LRUStore(os.path.join(self.tmpdir, 'store.db'), 100)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_get_set(self):
+        assert self.store.get('missing') is None
+        self.store.set('key', 'value')
+        assert self.store.get('key') == 'value'
+        stats = self.store.stats()
+        assert stats['hits'] == 1
+        assert stats['misses'] == 1
+        assert stats['bytes'] == 5
+
+    def test_evicts_least_recently_used(self):
+        self.store.touch_interval = 0
+        self.store.set('a', 'x' * 40)
+        self.store.set('b', 'x' * 40)
+        self.store.get('a')
+        self.store.set('c', 'x' * 40)
+        assert self.store.get('b') is None
+        assert self.store.get('a') is not None
+        assert self.store.stats()['evictions'] == 1
+
+    def test_reads_dont_write(self):
+        self.store.set('key', 'value')
+        conn = self.store.connection
+        changes = conn.total_changes
+        assert self.store.get('key') == 'value'
+        assert self.store.get('missing') is None
+        assert conn.total_changes == changes
+        assert self.store.stats()['hits'] == 1
+
+    def test_over_budget_not_stored(self):
+        self.store.set('big', 'x' * 101)
+        assert self.store.get('big') is None
@@ -0,0 +1,23 @@
+from unittest import TestCase
+
+from pastie.tests import *
+from pastie.lib.tagindex import TagIndex
+from pastie.model import Session, Paste
+
+class TestTagIndex(TestCase):
+
+    def test_suggest(self):
+        Paste('author', 'title', 'text', u'one', tags='suggested-a suggested-b')
+        Paste('author', 'title', 'text', u'two', tags='suggested-b')
+        Session.commit()
+        index = TagIndex()
+        assert index.suggest('suggested') == ['suggested-b', 'suggested-a']
+        assert index.suggest('suggested', 1) == ['suggested-b']
+        assert index.suggest('suggestez') == []
+
+    def test_add(self):
+        index = TagIndex(ttl=0)
+        index.load()
+        index.add(['added-a', 'added-b'])
+        index.add(['added-a'])
+        assert index.suggest('added') == ['added-a', 'added-b']
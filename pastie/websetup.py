@@ -26,5 +26,8 @@ def setup_config(command, filename, section, vars):
 
     print "Creating tables"
     model.metadata.create_all(engine)
+    engine.execute(model.common.counter_table.insert(),
+                   [dict(name='pastes', value=0),
+                    dict(name='generation:pastes', value=0)])
     print "Successfully setup"
 